@@ -0,0 +1,55 @@
+import json
+from datetime import timedelta
+
+import pytest
+import requests
+
+from restful_booker.models.factory import make_bookings
+from restful_booker.utils import logger as response_logger
+from restful_booker.utils.booker_server import BookerServer
+from restful_booker.utils.logger import (
+    VERBOSITY_OFF,
+    configure_response_logging,
+)
+
+
+@pytest.fixture(scope="session")
+def bookings_payload():
+    """100 тысяч бронирований в виде словарей, как они приходят в JSON"""
+    return [booking.model_dump() for booking in make_bookings(100_000, seed=1)]
+
+
+@pytest.fixture(scope="session")
+def booker_server():
+    with BookerServer() as server:
+        yield server
+
+
+@pytest.fixture
+def quiet_logging():
+    """Без логирования ответов, чтобы замеры E2E не включали вывод.
+    После теста возвращается прежний режим, каким бы он ни был"""
+    previous = response_logger._verbosity
+    configure_response_logging(verbosity=VERBOSITY_OFF)
+    yield
+    configure_response_logging(verbosity=previous)
+
+
+@pytest.fixture
+def make_response():
+    return _make_response
+
+
+def _make_response(payload, status_code=200):
+    """requests.Response с JSON телом без обращения к сети"""
+    request = requests.Request(
+        "POST", "http://localhost/booking", json=payload
+    ).prepare()
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = request.url
+    response.request = request
+    response.headers["Content-Type"] = "application/json"
+    response.elapsed = timedelta(milliseconds=5)
+    response._content = json.dumps(payload).encode()
+    return response
@@ -0,0 +1,100 @@
+import json
+import logging
+
+import pytest
+
+from restful_booker.models.booking import Booking, BookingList, BookingResponse
+from restful_booker.utils import logger as response_logger
+from restful_booker.utils import schema_registry
+from restful_booker.utils.logger import (
+    flush_attachments,
+    response_attaching,
+    response_logging,
+    start_attachments,
+)
+
+VALIDATION_BATCH = 10_000
+
+
+def test_booking_validation(benchmark, bookings_payload):
+    payload = bookings_payload[:VALIDATION_BATCH]
+
+    def validate():
+        for booking in payload:
+            Booking.model_validate(booking)
+
+    benchmark(validate)
+
+
+def test_booking_response_validation(benchmark, bookings_payload):
+    payload = [
+        {"bookingid": booking_id, "booking": booking}
+        for booking_id, booking in enumerate(
+            bookings_payload[:VALIDATION_BATCH], start=1
+        )
+    ]
+
+    def validate():
+        for response in payload:
+            BookingResponse.model_validate(response)
+
+    benchmark(validate)
+
+
+@pytest.mark.parametrize("size", [10_000, 100_000])
+def test_booking_list_validation(benchmark, bookings_payload, size):
+    """Пачка бронирований из байтов JSON одним вызовом TypeAdapter"""
+    content = json.dumps(bookings_payload[:size]).encode()
+
+    benchmark.pedantic(BookingList.validate_json, args=(content,), rounds=5)
+
+
+@pytest.mark.parametrize("size", [10_000, 100_000])
+def test_get_all_booking_schema_validation(benchmark, size):
+    instance = [{"bookingid": booking_id} for booking_id in range(size)]
+    schema_registry.get_validator("get_all_booking")
+
+    benchmark.pedantic(
+        schema_registry.validate,
+        args=("get_all_booking", instance),
+        rounds=5,
+    )
+
+
+def test_response_logging(benchmark, bookings_payload, make_response):
+    response = make_response(bookings_payload[0])
+    previous_level = response_logger.logger.level
+    previous_propagate = response_logger.logger.propagate
+    handler = logging.NullHandler()
+    response_logger.logger.addHandler(handler)
+    response_logger.logger.propagate = False
+    response_logger.logger.setLevel(logging.INFO)
+    try:
+        benchmark(response_logging, response)
+    finally:
+        response_logger.logger.removeHandler(handler)
+        response_logger.logger.setLevel(previous_level)
+        response_logger.logger.propagate = previous_propagate
+
+
+@pytest.mark.parametrize("failed", [False, True], ids=["passed", "failed"])
+def test_response_attaching(
+    benchmark, bookings_payload, make_response, failed, monkeypatch
+):
+    """Накопление вложения и сброс по итогам теста: для упавшего теста
+    включает сериализацию тел в JSON. allure.attach заглушен, чтобы
+    замер не включал запись файлов в каталог результатов Allure"""
+    monkeypatch.setattr("allure.attach", lambda *args, **kwargs: None)
+    response = make_response(bookings_payload[0])
+    sample_rate = response_logger._attach_sample_rate
+
+    def attach():
+        start_attachments()
+        response_attaching(response)
+        flush_attachments(failed=failed, finished=True)
+
+    response_logger.configure_response_attaching(sample_rate=0.0)
+    try:
+        benchmark(attach)
+    finally:
+        response_logger.configure_response_attaching(sample_rate=sample_rate)
@@ -0,0 +1,88 @@
+from urllib.parse import urljoin
+
+import pytest
+
+from restful_booker.functions.api_helper import (
+    change_all_fields_in_booking,
+    create_booking,
+    create_token_to_auth,
+    create_url_to_get_booking_by_id,
+    delete_booking,
+    get_booking_by_id,
+    get_id_new_booking,
+)
+from restful_booker.functions.client import BookerClient
+from restful_booker.models.factory import make_booking, make_bookings
+from restful_booker.utils.booker_server import (
+    DEFAULT_PASSWORD,
+    DEFAULT_USER_NAME,
+)
+
+
+@pytest.fixture(scope="module")
+def client():
+    with BookerClient() as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def token(booker_server, client):
+    return create_token_to_auth(
+        urljoin(booker_server.url, "auth"),
+        DEFAULT_USER_NAME,
+        DEFAULT_PASSWORD,
+        client=client,
+    )
+
+
+@pytest.fixture
+def booking_url(booker_server, client):
+    url = urljoin(booker_server.url, "booking")
+    booking_id = get_id_new_booking(
+        create_booking(url, make_booking(seed=1), client=client)
+    )
+    return create_url_to_get_booking_by_id(url, booking_id)
+
+
+@pytest.mark.usefixtures("quiet_logging")
+def test_create_booking(benchmark, booker_server, client):
+    url = urljoin(booker_server.url, "booking")
+    booking = make_booking(seed=1)
+    benchmark(create_booking, url, booking, client=client)
+
+
+@pytest.mark.usefixtures("quiet_logging")
+def test_get_booking_by_id(benchmark, client, booking_url):
+    benchmark(get_booking_by_id, booking_url, client=client)
+
+
+@pytest.mark.usefixtures("quiet_logging")
+def test_change_all_fields_in_booking(benchmark, client, token, booking_url):
+    booking = make_booking(seed=2)
+    benchmark(
+        change_all_fields_in_booking,
+        token,
+        booking_url,
+        booking,
+        client=client,
+    )
+
+
+@pytest.mark.usefixtures("quiet_logging")
+def test_crud_flow(benchmark, booker_server, client, token):
+    """Полный сценарий: создание, получение, PUT, удаление"""
+    url = urljoin(booker_server.url, "booking")
+    booking, booking_with_change = make_bookings(2, seed=3)
+
+    def flow():
+        booking_id = get_id_new_booking(
+            create_booking(url, booking, client=client)
+        )
+        url_booking_id = create_url_to_get_booking_by_id(url, booking_id)
+        get_booking_by_id(url_booking_id, client=client)
+        change_all_fields_in_booking(
+            token, url_booking_id, booking_with_change, client=client
+        )
+        delete_booking(token, url_booking_id, client=client)
+
+    benchmark(flow)
@@ -0,0 +1,2 @@
+"""Restful Booker: клиент API, модели, локальная замена сервиса и
+инструменты нагрузочных и длительных прогонов"""
@@ -0,0 +1,173 @@
+import logging
+from urllib.parse import urljoin
+
+from restful_booker.functions.client import BookerClient, get_default_client
+from restful_booker.functions.result import ApiResult
+from restful_booker.models.booking import (
+    AuthCredentials,
+    Booking,
+    BookingId,
+    BookingResponse,
+)
+from restful_booker.utils.json_stream import iter_json_array
+from restful_booker.utils.logger import response_attaching, response_logging
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def create_booking(url, booking: Booking, client: BookerClient = None):
+    client = client or get_default_client()
+    payload = booking.model_dump()
+    result = ApiResult(client.post(url, json=payload))
+    response_logging(result)
+    response_attaching(result)
+
+    result.validate(BookingResponse)
+
+    return result
+
+
+def get_id_new_booking(response):
+    return response.json().get("bookingid")
+
+
+def get_all_bookings(url, client: BookerClient = None):
+    client = client or get_default_client()
+    result = ApiResult(client.get(url))
+    response_logging(result)
+    response_attaching(result)
+    return result
+
+
+def iter_booking_ids(
+    url,
+    limit=None,
+    predicate=None,
+    client: BookerClient = None,
+    chunk_size=STREAM_CHUNK_SIZE,
+):
+    """Потоковое чтение ID из GET /booking.
+
+    Ответ читается кусками, каждый элемент валидируется моделью BookingId
+    сразу после получения. predicate(booking_id) отбирает ID, limit
+    останавливает чтение после limit подходящих ID - остаток ответа не
+    скачивается, соединение закрывается.
+    """
+    client = client or get_default_client()
+    with client.get(url, stream=True) as response:
+        response_logging(response)
+        response.raise_for_status()
+        found = 0
+        for item in iter_json_array(response.iter_content(chunk_size)):
+            booking_id = BookingId.model_validate(item).bookingid
+            if predicate is not None and not predicate(booking_id):
+                continue
+            yield booking_id
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+
+def get_booking_by_id(url_booking_id, client: BookerClient = None):
+    client = client or get_default_client()
+    if client.booking_cache is None:
+        return _fetch_booking(client, url_booking_id)
+    return client.booking_cache.get_or_fetch(
+        url_booking_id,
+        lambda headers: _fetch_booking(client, url_booking_id, headers),
+    )
+
+
+def _fetch_booking(client, url_booking_id, headers=None):
+    result = ApiResult(client.get(url_booking_id, headers=headers))
+    response_logging(result)
+    response_attaching(result)
+
+    if result.status_code == 200:
+        result.validate(Booking)
+
+    return result
+
+
+def _invalidate_booking(client, url_booking_id):
+    if client.booking_cache is not None:
+        client.booking_cache.invalidate(url_booking_id)
+
+
+def create_url_to_get_booking_by_id(url, id):
+    return urljoin(url, f"booking/{id}")
+
+
+def create_token_to_auth(
+    url, user_name, password, client: BookerClient = None
+):
+    client = client or get_default_client()
+    credentials = AuthCredentials(username=user_name, password=password)
+    result = ApiResult(client.post(url, json=credentials.model_dump()))
+    response_logging(result)
+    response_attaching(result)
+    return result.json().get("token")
+
+
+def request_with_token(client, method, url, token, **kwargs):
+    """Запрос с токеном в cookie.
+
+    token - строка или TokenProvider из functions/auth.py. Для провайдера
+    при ответе 403 токен обновляется и запрос повторяется один раз.
+    """
+    if not hasattr(token, "get_token"):
+        return client.request(method, url, cookies={"token": token}, **kwargs)
+
+    value = token.get_token()
+    response = client.request(method, url, cookies={"token": value}, **kwargs)
+    if response.status_code == 403:
+        token.invalidate(value)
+        response = client.request(
+            method, url, cookies={"token": token.get_token()}, **kwargs
+        )
+    return response
+
+
+def change_all_fields_in_booking(
+    token, url_booking_id, booking: Booking, client: BookerClient = None
+):
+    client = client or get_default_client()
+    payload = booking.model_dump()
+    result = ApiResult(
+        request_with_token(client, "PUT", url_booking_id, token, json=payload)
+    )
+    _invalidate_booking(client, url_booking_id)
+    response_logging(result)
+    response_attaching(result)
+
+    result.validate(Booking)
+
+    return result
+
+
+def change_one_fields_in_booking(
+    token, url_booking_id, field_with_change, client: BookerClient = None
+):
+    client = client or get_default_client()
+    result = ApiResult(
+        request_with_token(
+            client, "PATCH", url_booking_id, token, json=field_with_change
+        )
+    )
+    _invalidate_booking(client, url_booking_id)
+    response_logging(result)
+    response_attaching(result)
+    return result
+
+
+def delete_booking(token, url_booking_id, client: BookerClient = None):
+    client = client or get_default_client()
+    result = ApiResult(
+        request_with_token(client, "DELETE", url_booking_id, token)
+    )
+    _invalidate_booking(client, url_booking_id)
+    response_logging(result)
+    response_attaching(result)
+    return result
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+
+import httpx
+
+from restful_booker.functions.cassette import get_cassette
+from restful_booker.models.booking import Booking, BookingResponse
+from restful_booker.utils.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_CONCURRENCY = 20
+
+_DEFAULT = object()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """Транспорт httpx поверх кассеты и обычного транспорта transport"""
+
+    def __init__(self, cassette, transport):
+        self.cassette = cassette
+        self.transport = transport
+
+    async def handle_async_request(self, request):
+        if self.cassette.replaying:
+            exchange = self.cassette.play(
+                request.method, str(request.url), request.content
+            )
+            return httpx.Response(
+                exchange["status"],
+                headers=exchange["headers"],
+                content=exchange["content"],
+                request=request,
+            )
+
+        response = await self.transport.handle_async_request(request)
+        if self.cassette.recording:
+            content = await response.aread()
+            self.cassette.record(
+                request.method,
+                str(request.url),
+                request.content,
+                response.status_code,
+                response.reason_phrase,
+                response.headers,
+                content,
+            )
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class AsyncBookerClient:
+    """Асинхронный клиент Restful Booker с общим пулом соединений.
+
+    cassette - как у BookerClient: запись или воспроизведение обменов,
+    по умолчанию общая кассета из functions/cassette.py. Таймауты по
+    умолчанию - из get_settings.
+    """
+
+    def __init__(
+        self,
+        base_url="",
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        connect_timeout=None,
+        read_timeout=None,
+        cassette=_DEFAULT,
+    ):
+        settings = get_settings()
+        connect_timeout = connect_timeout or settings.connect_timeout
+        read_timeout = read_timeout or settings.read_timeout
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        cassette = get_cassette() if cassette is _DEFAULT else cassette
+        transport = None
+        if cassette is not None:
+            transport = AsyncCassetteTransport(
+                cassette, httpx.AsyncHTTPTransport(limits=limits)
+            )
+        self.client = httpx.AsyncClient(
+            base_url=base_url or "",
+            limits=limits,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            transport=transport,
+        )
+
+    async def request(self, method, url, token=None, **kwargs):
+        """token - строка или TokenProvider: для провайдера при ответе 403
+        токен обновляется и запрос повторяется один раз"""
+        if not hasattr(token, "get_token_async"):
+            return await self._send(method, url, token, **kwargs)
+
+        value = await token.get_token_async()
+        response = await self._send(method, url, value, **kwargs)
+        if response.status_code == 403:
+            token.invalidate(value)
+            value = await token.get_token_async()
+            response = await self._send(method, url, value, **kwargs)
+        return response
+
+    async def _send(self, method, url, token, **kwargs):
+        if token is not None:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers["Cookie"] = f"token={token}"
+            kwargs["headers"] = headers
+        response = await self.client.request(method, url, **kwargs)
+        logger.debug(
+            "%s %s -> %s", method, response.request.url, response.status_code
+        )
+        return response
+
+    async def create_booking(self, url, booking: Booking):
+        response = await self.request("POST", url, json=booking.model_dump())
+        BookingResponse.model_validate_json(response.content)
+        return response
+
+    async def get_booking_by_id(self, url_booking_id):
+        response = await self.request("GET", url_booking_id)
+        if response.status_code == 200:
+            Booking.model_validate_json(response.content)
+        return response
+
+    async def change_all_fields_in_booking(
+        self, token, url_booking_id, booking: Booking
+    ):
+        response = await self.request(
+            "PUT", url_booking_id, token=token, json=booking.model_dump()
+        )
+        Booking.model_validate_json(response.content)
+        return response
+
+    async def change_one_fields_in_booking(
+        self, token, url_booking_id, field_with_change
+    ):
+        return await self.request(
+            "PATCH", url_booking_id, token=token, json=field_with_change
+        )
+
+    async def delete_booking(self, token, url_booking_id):
+        return await self.request("DELETE", url_booking_id, token=token)
+
+    async def create_bookings(
+        self, url, bookings, concurrency=DEFAULT_CONCURRENCY, results=None
+    ):
+        """Создание пачки бронирований, не более concurrency одновременно.
+
+        Ответы возвращаются в порядке входных бронирований. results - как
+        у gather_limited: в нем остаются ответы на уже созданные
+        бронирования, даже если пачка оборвалась ошибкой.
+        """
+        return await gather_limited(
+            (self.create_booking(url, booking) for booking in bookings),
+            concurrency,
+            results=results,
+        )
+
+    async def get_bookings(
+        self, base_url, ids, concurrency=DEFAULT_CONCURRENCY
+    ):
+        """Получение бронирований по списку ID, ответы в порядке ids"""
+        base_url = base_url.rstrip("/")
+        return await gather_limited(
+            (
+                self.get_booking_by_id(f"{base_url}/booking/{booking_id}")
+                for booking_id in ids
+            ),
+            concurrency,
+        )
+
+    async def delete_bookings(
+        self, token, urls_booking_id, concurrency=DEFAULT_CONCURRENCY
+    ):
+        """Удаление бронирований по списку URL, ответы в порядке входа"""
+        return await gather_limited(
+            (self.delete_booking(token, url) for url in urls_booking_id),
+            concurrency,
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+async def gather_limited(coroutines, concurrency, results=None):
+    """Выполнение корутин не более чем в concurrency воркерах.
+
+    Корутины берутся из итератора лениво, поэтому в памяти одновременно
+    живет не больше concurrency запросов. Результаты - в порядке входа.
+
+    results - необязательный словарь {индекс: результат}, который
+    заполняется по мере завершения корутин. При первой ошибке остальные
+    корутины отменяются, а ошибка пробрасывается как есть (без
+    ExceptionGroup); успевшие результаты остаются в results.
+    """
+    if concurrency <= 0:
+        raise ValueError(f"concurrency должно быть больше 0: {concurrency}")
+    results = {} if results is None else results
+    pending = enumerate(coroutines)
+
+    async def worker():
+        for index, coroutine in pending:
+            results[index] = await coroutine
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            for _ in range(concurrency):
+                group.create_task(worker())
+    except BaseExceptionGroup as errors:
+        raise _first_error(errors) from None
+    return [results[index] for index in range(len(results))]
+
+
+def _first_error(errors):
+    while isinstance(errors, BaseExceptionGroup):
+        errors = errors.exceptions[0]
+    return errors
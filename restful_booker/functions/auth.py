@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+from restful_booker.functions.api_helper import create_token_to_auth
+
+DEFAULT_TOKEN_TTL = 600.0
+
+
+class AuthError(Exception):
+    """Сервис не выдал токен по переданным учетным данным"""
+
+
+class TokenProvider:
+    """Кэш токена авторизации с временем жизни.
+
+    Токен запрашивается через create_token_to_auth при первом обращении и
+    после истечения ttl секунд. Потокобезопасен: параллельные обращения
+    к просроченному токену приводят к одному POST /auth.
+    """
+
+    def __init__(
+        self, auth_url, user_name, password, ttl=DEFAULT_TOKEN_TTL, client=None
+    ):
+        self.auth_url = auth_url
+        self.user_name = user_name
+        self.password = password
+        self.ttl = ttl
+        self.client = client
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_token(self):
+        with self._lock:
+            if self._token is None or time.monotonic() >= self._expires_at:
+                self._token = self._request_token()
+                self._expires_at = time.monotonic() + self.ttl
+            return self._token
+
+    async def get_token_async(self):
+        return await asyncio.to_thread(self.get_token)
+
+    def invalidate(self, token=None):
+        """Сброс токена. Если передан token, сбрасывается только он, чтобы
+        не выбросить уже обновленный другим потоком токен"""
+        with self._lock:
+            if token is None or token == self._token:
+                self._token = None
+
+    def _request_token(self):
+        token = create_token_to_auth(
+            self.auth_url, self.user_name, self.password, client=self.client
+        )
+        if not token:
+            raise AuthError(
+                f"Не удалось получить токен для {self.user_name} "
+                f"на {self.auth_url}"
+            )
+        return token
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_token_provider(auth_url, user_name, password, ttl=DEFAULT_TOKEN_TTL):
+    """Общий TokenProvider на пару (auth_url, user_name)"""
+    key = (auth_url, user_name)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None or provider.password != password:
+            provider = TokenProvider(auth_url, user_name, password, ttl=ttl)
+            _providers[key] = provider
+        return provider
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 30.0
+
+
+class CacheEntry:
+    """Закэшированный ответ GET /booking/{id} и его валидаторы"""
+
+    __slots__ = ("result", "etag", "last_modified", "stored_at")
+
+    def __init__(self, result):
+        self.result = result
+        self.etag = result.headers.get("ETag")
+        self.last_modified = result.headers.get("Last-Modified")
+        self.stored_at = time.monotonic()
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class BookingCache:
+    """LRU кэш ответов GET /booking/{id} с временем жизни.
+
+    Ключ - URL бронирования, то есть ID на конкретном сервисе. Свежая
+    запись (моложе ttl секунд) отдается без запроса. Устаревшая запись с
+    ETag или Last-Modified перепроверяется условным запросом: ответ 304
+    продлевает ее, иначе она заменяется новым ответом. Хранятся только
+    ответы 200, при переполнении вытесняется давно не читанная запись.
+
+    Отдается тот же ApiResult, что был получен при промахе, поэтому
+    результат из кэша нельзя менять.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, key, fetch):
+        """Ответ из кэша или fetch(headers) -> ApiResult, где headers -
+        заголовки условного запроса (пустые, если валидаторов нет)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if time.monotonic() - entry.stored_at < self.ttl:
+                    self.hits += 1
+                    return entry.result
+        headers = entry.conditional_headers() if entry is not None else {}
+
+        result = fetch(headers)
+        with self._lock:
+            if result.status_code == 304 and entry is not None:
+                self.revalidated += 1
+                entry.stored_at = time.monotonic()
+                if self._entries.get(key) is entry:
+                    self._entries.move_to_end(key)
+                return entry.result
+            self.misses += 1
+            if result.status_code == 200:
+                self._entries[key] = CacheEntry(result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._entries.pop(key, None)
+        return result
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Счетчики попаданий: revalidated - ответы 304 на условный
+        запрос, они тоже избавляют от повторного скачивания тела"""
+        with self._lock:
+            requests = self.hits + self.misses + self.revalidated
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+                "hit_ratio": (
+                    (self.hits + self.revalidated) / requests
+                    if requests
+                    else 0.0
+                ),
+            }
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from collections import deque
+from urllib.parse import urljoin
+
+from restful_booker.functions.api_helper import (
+    create_booking,
+    get_id_new_booking,
+)
+from restful_booker.functions.async_api_helper import (
+    DEFAULT_CONCURRENCY,
+    AsyncBookerClient,
+)
+from restful_booker.models.factory import make_bookings
+
+DEFAULT_POOL_SIZE = 10
+
+
+class BookingPool:
+    """Заранее созданные бронирования, которые тесты забирают себе.
+
+    fill создает все бронирования пачкой через асинхронный клиент,
+    checkout выдает каждое не больше одного раза (и создает новое, если
+    пул закончился), cleanup параллельно удаляет все созданные, кроме
+    снятых с учета через forget.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        token,
+        size=DEFAULT_POOL_SIZE,
+        seed=None,
+        name_prefix="",
+        concurrency=DEFAULT_CONCURRENCY,
+    ):
+        self.base_url = base_url
+        self.token = token
+        self.size = size
+        self.seed = seed
+        self.name_prefix = name_prefix
+        self.concurrency = concurrency
+        self.created_ids = []
+        self._available = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def booking_url(self):
+        return urljoin(self.base_url, "booking")
+
+    def fill(self):
+        bookings = make_bookings(
+            self.size, seed=self.seed, name_prefix=self.name_prefix
+        )
+        created = {}
+        try:
+            asyncio.run(self._create_all(bookings, created))
+        finally:
+            # Созданные до ошибки бронирования тоже удалит cleanup
+            with self._lock:
+                for index, response in sorted(created.items()):
+                    booking_id = response.json()["bookingid"]
+                    self.created_ids.append(booking_id)
+                    self._available.append((booking_id, bookings[index]))
+        return self
+
+    def checkout(self):
+        """Пара (ID, Booking) бронирования, которое больше никому не
+        выдается"""
+        with self._lock:
+            if self._available:
+                return self._available.popleft()
+        booking = make_bookings(1, name_prefix=self.name_prefix)[0]
+        booking_id = get_id_new_booking(
+            create_booking(self.booking_url, booking)
+        )
+        self.track(booking_id)
+        return booking_id, booking
+
+    def track(self, booking_id):
+        """Регистрация созданного в обход пула бронирования для удаления
+        в cleanup"""
+        with self._lock:
+            self.created_ids.append(booking_id)
+
+    def forget(self, booking_id):
+        """Снятие с учета удаленного тестом бронирования, чтобы cleanup не
+        удалял его повторно"""
+        with self._lock:
+            self.created_ids.remove(booking_id)
+
+    def cleanup(self):
+        with self._lock:
+            ids, self.created_ids = self.created_ids, []
+            self._available.clear()
+        if ids:
+            asyncio.run(self._delete_all(ids))
+
+    async def _create_all(self, bookings, created):
+        async with AsyncBookerClient(
+            max_connections=self.concurrency
+        ) as client:
+            return await client.create_bookings(
+                self.booking_url,
+                bookings,
+                concurrency=self.concurrency,
+                results=created,
+            )
+
+    async def _delete_all(self, ids):
+        base_url = self.booking_url.rstrip("/")
+        async with AsyncBookerClient(
+            max_connections=self.concurrency
+        ) as client:
+            await client.delete_bookings(
+                self.token,
+                [f"{base_url}/{booking_id}" for booking_id in ids],
+                concurrency=self.concurrency,
+            )
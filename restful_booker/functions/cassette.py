@@ -0,0 +1,257 @@
+"""Запись и воспроизведение HTTP обменов (кассеты).
+
+Режимы: passthrough - запросы идут в сеть как обычно, record - обмены
+еще и записываются, replay - ответы берутся из кассеты без сети.
+Кассета - gzip JSONL, одна строка на обмен. Обмен ищется по хэшу метода,
+пути с query и тела запроса: хост не учитывается, тело JSON приводится к
+каноническому виду, поэтому запись с локальной заменой сервиса можно
+воспроизводить с любым base_url. Одинаковые запросы отдаются в порядке
+записи, после последнего повторяется последний ответ. При записи
+потоковые ответы (stream=True) отдаются по мере чтения, а в кассету
+попадают, когда тело дочитано или ответ закрыт.
+
+Кассету подключает BookerClient (functions/client.py) и
+AsyncBookerClient (functions/async_api_helper.py, транспорт
+AsyncCassetteTransport): явно аргументом cassette или через общую
+кассету из set_cassette.
+"""
+
+import base64
+import gzip
+import hashlib
+import io
+import json
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from restful_booker.utils.metrics import endpoint_template
+
+MODE_PASSTHROUGH = "passthrough"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODES = (MODE_PASSTHROUGH, MODE_RECORD, MODE_REPLAY)
+
+# Тела хранятся уже раскодированными, поэтому заголовки кодирования и
+# длины при воспроизведении пересчитываются заново
+_DROPPED_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding"}
+)
+
+
+class CassetteMissError(LookupError):
+    """В кассете нет обмена для запроса в режиме replay"""
+
+
+def exchange_key(method, url, body):
+    parts = urlsplit(url)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    digest = hashlib.sha1(f"{method.upper()} {target}\n".encode())
+    digest.update(_canonical_body(body))
+    return digest.hexdigest()
+
+
+def _canonical_body(body):
+    if not body:
+        return b""
+    if isinstance(body, str):
+        body = body.encode()
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return body
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+
+
+class Cassette:
+    """Набор записанных обменов в файле path.
+
+    В режиме replay файл читается сразу, в режиме record обмены копятся
+    в памяти и пишутся в файл при save (или выходе из with).
+    """
+
+    def __init__(self, path, mode=MODE_PASSTHROUGH):
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим кассеты: {mode}")
+        self.path = path
+        self.mode = mode
+        self.recorded = []
+        self.played = 0
+        self._exchanges = {}
+        self._lock = threading.Lock()
+        if mode == MODE_REPLAY:
+            self.load()
+
+    @property
+    def recording(self):
+        return self.mode == MODE_RECORD
+
+    @property
+    def replaying(self):
+        return self.mode == MODE_REPLAY
+
+    def load(self):
+        exchanges = {}
+        with gzip.open(self.path, "rt", encoding="utf-8") as file:
+            for line in file:
+                exchange = json.loads(line)
+                exchanges.setdefault(exchange["key"], deque()).append(exchange)
+        with self._lock:
+            self._exchanges = exchanges
+
+    def save(self):
+        with self._lock:
+            exchanges = list(self.recorded)
+        with gzip.open(self.path, "wt", encoding="utf-8") as file:
+            for exchange in exchanges:
+                file.write(json.dumps(exchange, separators=(",", ":")))
+                file.write("\n")
+
+    def record(self, method, url, body, status, reason, headers, content):
+        exchange = {
+            "key": exchange_key(method, url, body),
+            "method": method.upper(),
+            "url": url,
+            "template": endpoint_template(url),
+            "request_body": _canonical_body(body).decode("utf-8", "replace"),
+            "status": status,
+            "reason": reason,
+            "headers": {
+                name: value
+                for name, value in headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            },
+            "body": base64.b64encode(content).decode("ascii"),
+        }
+        with self._lock:
+            self.recorded.append(exchange)
+
+    def play(self, method, url, body):
+        """Записанный обмен: словарь со status, reason, headers и content"""
+        key = exchange_key(method, url, body)
+        with self._lock:
+            queue = self._exchanges.get(key)
+            if not queue:
+                raise CassetteMissError(
+                    f"В кассете {self.path} нет ответа на {method} {url}"
+                )
+            exchange = queue.popleft() if len(queue) > 1 else queue[0]
+            self.played += 1
+        return {
+            "status": exchange["status"],
+            "reason": exchange["reason"],
+            "headers": exchange["headers"],
+            "content": base64.b64decode(exchange["body"]),
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.recording:
+            self.save()
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Транспорт requests поверх кассеты, монтируется в Session"""
+
+    def __init__(self, cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.cassette.replaying:
+            exchange = self.cassette.play(
+                request.method, request.url, request.body
+            )
+            raw = HTTPResponse(
+                body=io.BytesIO(exchange["content"]),
+                headers=exchange["headers"],
+                status=exchange["status"],
+                reason=exchange["reason"],
+                preload_content=False,
+                decode_content=False,
+            )
+            return self.build_response(request, raw)
+
+        response = super().send(request, **kwargs)
+        if not self.cassette.recording:
+            return response
+
+        def record(content):
+            self.cassette.record(
+                request.method,
+                request.url,
+                request.body,
+                response.status_code,
+                response.reason,
+                response.headers,
+                content,
+            )
+
+        if kwargs.get("stream"):
+            response.raw = _RecordingStream(response.raw, record)
+        else:
+            record(response.content)
+        return response
+
+
+class _RecordingStream:
+    """Тело потокового ответа, которое копится для кассеты по мере чтения.
+
+    Обмен записывается, когда тело дочитано или ответ закрыт: при раннем
+    закрытии остаток тела дочитывается, чтобы в кассету не попал обрезанный
+    ответ.
+    """
+
+    def __init__(self, raw, on_complete):
+        self._raw = raw
+        self._chunks = []
+        self._on_complete = on_complete
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def stream(self, amt=2**16, decode_content=None):
+        for chunk in self._raw.stream(amt, decode_content=decode_content):
+            self._chunks.append(chunk)
+            yield chunk
+        self._complete()
+
+    def read(self, amt=None, decode_content=None, **kwargs):
+        data = self._raw.read(amt, decode_content=decode_content, **kwargs)
+        self._chunks.append(data)
+        if amt is None or not data:
+            self._complete()
+        return data
+
+    def close(self):
+        if self._on_complete is not None:
+            self._chunks.extend(self._raw.stream(decode_content=True))
+            self._complete()
+        self._raw.close()
+
+    def _complete(self):
+        on_complete, self._on_complete = self._on_complete, None
+        if on_complete is not None:
+            on_complete(b"".join(self._chunks))
+
+
+_cassette = None
+
+
+def get_cassette():
+    """Общая кассета, которую подхватывают новые клиенты"""
+    return _cassette
+
+
+def set_cassette(cassette):
+    """Подмена общей кассеты, возвращает предыдущую"""
+    global _cassette
+    previous, _cassette = _cassette, cassette
+    return previous
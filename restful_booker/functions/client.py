@@ -0,0 +1,158 @@
+import threading
+import time
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from restful_booker.functions.cassette import CassetteAdapter, get_cassette
+from restful_booker.functions.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    send_with_resilience,
+)
+from restful_booker.utils.settings import get_settings
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+_DEFAULT = object()
+
+
+class BookerClient:
+    """HTTP клиент Restful Booker с пулом keep-alive соединений.
+
+    По умолчанию идемпотентные запросы повторяются при сбоях соединения,
+    таймаутах и 5xx (RetryPolicy), а при недоступности сервиса запросы
+    сразу падают с CircuitOpenError (CircuitBreaker). retry_policy=None и
+    circuit_breaker=None отключают соответствующий слой.
+
+    observers - объекты с методом on_response(method, url, response,
+    total_s), которые получают каждый ответ, например
+    utils.metrics.RequestMetrics.
+
+    booking_cache - необязательный BookingCache из
+    functions/booking_cache.py: через него get_booking_by_id читает
+    бронирования, а изменяющие функции из api_helper сбрасывают записи.
+
+    cassette - Cassette из functions/cassette.py для записи или
+    воспроизведения обменов, по умолчанию общая из set_cassette.
+
+    Таймауты по умолчанию берутся из get_settings (utils/settings.py).
+    """
+
+    def __init__(
+        self,
+        base_url=None,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        connect_timeout=None,
+        read_timeout=None,
+        retry_policy=_DEFAULT,
+        circuit_breaker=_DEFAULT,
+        observers=(),
+        booking_cache=None,
+        cassette=_DEFAULT,
+    ):
+        self.base_url = base_url
+        self.observers = list(observers)
+        self.booking_cache = booking_cache
+        settings = get_settings()
+        self.timeout = (
+            connect_timeout or settings.connect_timeout,
+            read_timeout or settings.read_timeout,
+        )
+        self.retry_policy = (
+            RetryPolicy() if retry_policy is _DEFAULT else retry_policy
+        )
+        self.circuit_breaker = (
+            CircuitBreaker()
+            if circuit_breaker is _DEFAULT
+            else circuit_breaker
+        )
+        self.cassette = get_cassette() if cassette is _DEFAULT else cassette
+        self.session = requests.Session()
+        if self.cassette is None:
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections, pool_maxsize=pool_maxsize
+            )
+        else:
+            adapter = CassetteAdapter(
+                self.cassette,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+            )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def build_url(self, url):
+        """Абсолютные URL возвращаются как есть, пути - от base_url"""
+        if self.base_url is None:
+            return url
+        return urljoin(self.base_url, url)
+
+    def request(self, method, url, idempotent=None, **kwargs):
+        """Запрос через пул. timeout можно переопределить на вызов (число
+        или пара (connect, read)), idempotent=True разрешает повторы для
+        POST/PATCH, idempotent=False запрещает их для остальных методов"""
+        kwargs.setdefault("timeout", self.timeout)
+        url = self.build_url(url)
+        started = time.perf_counter()
+        response = send_with_resilience(
+            lambda: self.session.request(method, url, **kwargs),
+            method,
+            retry_policy=self.retry_policy,
+            circuit_breaker=self.circuit_breaker,
+            idempotent=idempotent,
+        )
+        total_s = time.perf_counter() - started
+        for observer in self.observers:
+            observer.on_response(method, url, response, total_s)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Общий клиент, которым пользуются функции из api_helper"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = BookerClient()
+    return _default_client
+
+
+def set_default_client(client):
+    """Подмена общего клиента, возвращает предыдущий"""
+    global _default_client
+    with _default_client_lock:
+        previous, _default_client = _default_client, client
+    return previous
@@ -0,0 +1,187 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from urllib.parse import urlencode, urljoin
+
+from restful_booker.functions.api_helper import iter_booking_ids
+from restful_booker.functions.filter_verifier import (
+    DEFAULT_WORKERS,
+    check_filter,
+    fetch_bookings,
+    sample_ids,
+)
+
+
+@dataclass(frozen=True)
+class BookingFilter:
+    """Параметры фильтра GET /booking, None - параметр не передается"""
+
+    firstname: str = None
+    lastname: str = None
+    checkin: str = None
+    checkout: str = None
+
+    def params(self):
+        return {
+            name: value
+            for name, value in asdict(self).items()
+            if value is not None
+        }
+
+    def query(self):
+        """Строка запроса с экранированием значений:
+        firstname=Jim&lastname=Brown"""
+        return urlencode(self.params())
+
+    def url(self, base_url):
+        url = urljoin(base_url, "booking")
+        query = self.query()
+        return f"{url}?{query}" if query else url
+
+    def __str__(self):
+        return self.query() or "<без фильтра>"
+
+
+class FilterPlanner:
+    """Выполнение набора фильтров с общими запросами.
+
+    plan(filters) отправляет каждый еще не выполненный фильтр один раз,
+    все параллельно, и запоминает списки ID на время жизни планировщика.
+    Детали бронирований (все ID или выборка из sample на фильтр)
+    запрашиваются одним пакетом на объединение ID всех фильтров, так что
+    ID из нескольких результатов скачивается один раз. report(filter)
+    сверяет результат фильтра с деталями без новых запросов деталей.
+
+    Ошибка запроса запоминается за своим фильтром: ids и report по нему
+    поднимают ее, остальные фильтры набора не затрагиваются. Блокировка
+    не держится во время запросов: фильтр, который уже выполняет другой
+    поток, не отправляется повторно, plan ждет его результата.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        sample=None,
+        workers=DEFAULT_WORKERS,
+        client=None,
+        seed=None,
+    ):
+        self.base_url = base_url
+        self.sample = sample
+        self.workers = workers
+        self.client = client
+        self.seed = seed
+        self.queries_sent = 0
+        self._ids = {}
+        self._checked = {}
+        self._errors = {}
+        self._bookings = {}
+        self._fetch_errors = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def plan(self, filters):
+        pending = []
+        waiting = []
+        with self._lock:
+            for booking_filter in dict.fromkeys(filters):
+                if (
+                    booking_filter in self._ids
+                    or booking_filter in self._errors
+                ):
+                    continue
+                done = self._in_flight.get(booking_filter)
+                if done is None:
+                    self._in_flight[booking_filter] = threading.Event()
+                    pending.append(booking_filter)
+                else:
+                    waiting.append(done)
+
+        if pending:
+            try:
+                self._execute(pending)
+            finally:
+                with self._lock:
+                    for booking_filter in pending:
+                        self._in_flight.pop(booking_filter).set()
+        for done in waiting:
+            done.wait()
+
+    def _execute(self, pending):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(self._query, booking_filter)
+                for booking_filter in pending
+            ]
+        ids = {}
+        errors = {}
+        for booking_filter, future in zip(pending, futures):
+            try:
+                ids[booking_filter] = future.result()
+            except Exception as error:
+                errors[booking_filter] = error
+
+        checked = {
+            booking_filter: sample_ids(result, self.sample, self.seed)
+            for booking_filter, result in ids.items()
+        }
+        to_fetch = set().union(*checked.values())
+        with self._lock:
+            to_fetch.difference_update(self._bookings)
+        bookings = {}
+        fetch_errors = {}
+        if to_fetch:
+            try:
+                bookings = fetch_bookings(
+                    self.base_url,
+                    sorted(to_fetch),
+                    self.workers,
+                    self.client,
+                    fetch_errors,
+                )
+            except Exception as error:
+                errors.update(dict.fromkeys(ids, error))
+                ids = checked = {}
+
+        with self._lock:
+            self.queries_sent += len(pending)
+            self._bookings.update(bookings)
+            self._fetch_errors.update(fetch_errors)
+            self._ids.update(ids)
+            self._checked.update(checked)
+            self._errors.update(errors)
+
+    def ids(self, booking_filter):
+        self.plan([booking_filter])
+        self._raise_error(booking_filter)
+        return self._ids[booking_filter]
+
+    def report(self, booking_filter, expected=None):
+        """FilterReport по фильтру, при необходимости фильтр выполняется"""
+        self.plan([booking_filter])
+        self._raise_error(booking_filter)
+        return check_filter(
+            booking_filter.params(),
+            self._ids[booking_filter],
+            self._bookings,
+            self._checked[booking_filter],
+            expected,
+            errors=self._fetch_errors,
+        )
+
+    def _raise_error(self, booking_filter):
+        error = self._errors.get(booking_filter)
+        if error is not None:
+            raise error
+
+    def stats(self):
+        return {
+            "filters": len(self._ids),
+            "errors": len(self._errors),
+            "queries_sent": self.queries_sent,
+            "bookings_fetched": len(self._bookings),
+        }
+
+    def _query(self, booking_filter):
+        url = booking_filter.url(self.base_url)
+        return list(dict.fromkeys(iter_booking_ids(url, client=self.client)))
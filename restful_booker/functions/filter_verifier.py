@@ -0,0 +1,197 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import requests
+from pydantic import ValidationError
+
+from restful_booker.functions.api_helper import (
+    create_url_to_get_booking_by_id,
+    get_booking_by_id,
+)
+from restful_booker.functions.client import BookerClient, get_default_client
+
+DEFAULT_WORKERS = 16
+FILTER_FIELDS = ("firstname", "lastname", "checkin", "checkout")
+
+
+def booking_matches(booking, filters):
+    """Подходит ли бронирование под фильтр GET /booking.
+
+    firstname и lastname сравниваются точно, checkin и checkout -
+    "больше или равно", как в документации Restful Booker.
+    """
+    dates = booking["bookingdates"]
+    for name, value in filters.items():
+        if value is None:
+            continue
+        if name in ("firstname", "lastname"):
+            if booking[name] != value:
+                return False
+        elif dates[name] < value:
+            return False
+    return True
+
+
+@dataclass
+class FilterReport:
+    """Результат проверки ответа фильтра.
+
+    missing - ID, удаленные между списком и запросом деталей (404),
+    errors - ID -> причина, по которой детали получить не удалось
+    (другой статус, ошибка запроса, тело не прошло модель Booking).
+    """
+
+    filters: dict
+    returned: int
+    checked: int
+    matched: list = field(default_factory=list)
+    mismatched: dict = field(default_factory=dict)
+    missing: list = field(default_factory=list)
+    errors: dict = field(default_factory=dict)
+    precision: float = 1.0
+    recall: float = None
+    unexpected: list = field(default_factory=list)
+    not_returned: list = field(default_factory=list)
+
+
+def fetch_bookings(
+    base_url, ids, workers=DEFAULT_WORKERS, client=None, errors=None
+):
+    """Детали бронирований по ID параллельно через общий пул соединений.
+
+    Возвращает словарь ID -> бронирование. ID с ответом не 200,
+    с деталями, не прошедшими модель Booking, или с ошибкой запроса в
+    словарь не попадают: одно такое бронирование не прерывает остальные.
+    В словарь errors, если он передан, записываются причины для всех
+    таких ID, кроме 404 - бронирование просто удалено.
+    """
+    own_client = client is None
+    if own_client:
+        default_client = get_default_client()
+        client = BookerClient(
+            pool_connections=1,
+            pool_maxsize=workers,
+            observers=default_client.observers,
+            booking_cache=default_client.booking_cache,
+        )
+
+    def fetch(booking_id):
+        url_booking_id = create_url_to_get_booking_by_id(base_url, booking_id)
+        try:
+            return booking_id, get_booking_by_id(url_booking_id, client=client)
+        except (ValidationError, requests.RequestException) as error:
+            return booking_id, error
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(fetch, ids))
+    finally:
+        if own_client:
+            client.close()
+    bookings = {}
+    for booking_id, result in results:
+        if isinstance(result, Exception):
+            reason = f"{type(result).__name__}: {result}"
+        elif result.status_code == 200:
+            bookings[booking_id] = result.json()
+            continue
+        elif result.status_code == 404:
+            continue
+        else:
+            reason = f"HTTP {result.status_code}"
+        if errors is not None:
+            errors[booking_id] = reason
+    return bookings
+
+
+def expected_ids(bookings, filters):
+    """ID из словаря ID -> бронирование, подходящие под фильтр"""
+    return {
+        booking_id
+        for booking_id, booking in bookings.items()
+        if booking_matches(booking, filters)
+    }
+
+
+def verify_filter(
+    base_url,
+    filters,
+    ids,
+    sample=None,
+    expected=None,
+    workers=DEFAULT_WORKERS,
+    client=None,
+    seed=None,
+):
+    """Проверка списка ID, который вернул GET /booking с фильтром.
+
+    Детали всех ID (или случайной выборки из sample штук) запрашиваются
+    параллельно и сверяются с фильтром: precision - доля подходящих среди
+    проверенных. Если передан expected - множество ID, посчитанное
+    локально (например, через expected_ids), считается и recall.
+    """
+    ids = list(dict.fromkeys(ids))
+    checked_ids = sample_ids(ids, sample, seed)
+    errors = {}
+    bookings = fetch_bookings(base_url, checked_ids, workers, client, errors)
+    return check_filter(
+        filters, ids, bookings, checked_ids, expected, errors=errors
+    )
+
+
+def sample_ids(ids, sample=None, seed=None):
+    """Все ids или случайная выборка из sample штук"""
+    if sample is not None and len(ids) > sample:
+        return random.Random(seed).sample(ids, sample)
+    return ids
+
+
+def check_filter(
+    filters, ids, bookings, checked_ids=None, expected=None, errors=None
+):
+    """Сверка уже полученных деталей бронирований с фильтром.
+
+    bookings - словарь ID -> бронирование (как из fetch_bookings),
+    checked_ids - какие из ids проверять, по умолчанию все, errors -
+    причины неудачных запросов деталей из fetch_bookings.
+    """
+    errors = errors or {}
+    filters = _active_filters(filters)
+    ids = list(dict.fromkeys(ids))
+    if checked_ids is None:
+        checked_ids = ids
+    report = FilterReport(
+        filters=filters, returned=len(ids), checked=len(checked_ids)
+    )
+    for booking_id in checked_ids:
+        booking = bookings.get(booking_id)
+        if booking_id in errors and booking is None:
+            report.errors[booking_id] = errors[booking_id]
+        elif booking is None:
+            report.missing.append(booking_id)
+        elif booking_matches(booking, filters):
+            report.matched.append(booking_id)
+        else:
+            report.mismatched[booking_id] = booking
+
+    found = len(report.matched) + len(report.mismatched)
+    if found:
+        report.precision = len(report.matched) / found
+    if expected is not None:
+        returned = set(ids)
+        expected = set(expected)
+        report.unexpected = sorted(returned - expected)
+        report.not_returned = sorted(expected - returned)
+        report.recall = (
+            len(returned & expected) / len(expected) if expected else 1.0
+        )
+    return report
+
+
+def _active_filters(filters):
+    return {
+        name: value
+        for name, value in filters.items()
+        if name in FILTER_FIELDS and value is not None
+    }
@@ -0,0 +1,177 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# 500 у Restful Booker - в том числе ответ на некорректное тело, поэтому
+# он не повторяется и признаком недоступности сервиса не считается
+RETRY_STATUSES = frozenset({502, 503, 504})
+UNAVAILABLE_STATUSES = RETRY_STATUSES
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Размыкатель открыт: сервис недоступен, запрос не отправлялся"""
+
+
+class RetryPolicy:
+    """Повторы с экспоненциальной задержкой и полным джиттером.
+
+    Повторяются только идемпотентные методы (GET, PUT, DELETE, ...), POST
+    и PATCH - только при retry_post=True или idempotent=True в вызове.
+    """
+
+    def __init__(
+        self,
+        max_retries=2,
+        backoff_base=0.2,
+        backoff_max=5.0,
+        retry_statuses=RETRY_STATUSES,
+        retry_post=False,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_post = retry_post
+
+    def allows(self, method, idempotent=None):
+        if idempotent is not None:
+            return idempotent
+        return method.upper() in IDEMPOTENT_METHODS or self.retry_post
+
+    def delay(self, attempt, retry_after=None):
+        """Задержка перед повтором attempt: Retry-After ответа, если он
+        есть, иначе полный джиттер; в обоих случаях не больше backoff_max"""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.backoff_max)
+        cap = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return random.uniform(0, cap)
+
+
+def retry_after_seconds(value):
+    """Значение заголовка Retry-After в секундах: число секунд или
+    HTTP-дата, None - если заголовка нет или он некорректен"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        return None
+    return moment.timestamp() - time.time()
+
+
+class CircuitBreaker:
+    """Размыкатель: после failure_threshold сбоев подряд запросы сразу
+    падают с CircuitOpenError, через reset_timeout секунд пропускается
+    один пробный запрос"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(
+                        f"Сервис недоступен, повтор не раньше чем через "
+                        f"{self.reset_timeout} с после последнего сбоя"
+                    )
+                self.state = self.HALF_OPEN
+                return
+            raise CircuitOpenError("Пробный запрос к сервису еще выполняется")
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def release(self):
+        """Пробный запрос завершился без ответа о состоянии сервиса
+        (например, ошибкой разбора): следующий запрос снова будет пробным"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if (
+                self.state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+def send_with_resilience(
+    send, method, retry_policy=None, circuit_breaker=None, idempotent=None
+):
+    """Вызов send() с повторами и размыкателем.
+
+    Ошибки соединения и таймауты считаются сбоями сервиса, остальные
+    исключения только освобождают пробный запрос размыкателя. Перед
+    повтором ответа с Retry-After выдерживается указанная сервисом пауза
+    (не больше backoff_max). У возвращенного ответа выставляются
+    retries - число повторов и total_elapsed - полное время вызова в
+    секундах вместе с задержками.
+    """
+    started = time.perf_counter()
+    can_retry = retry_policy is not None and retry_policy.allows(
+        method, idempotent
+    )
+    attempt = 0
+    while True:
+        if circuit_breaker is not None:
+            circuit_breaker.before_call()
+        retry_after = None
+        try:
+            response = send()
+        except TRANSIENT_ERRORS:
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure()
+            if not can_retry or attempt >= retry_policy.max_retries:
+                raise
+        except BaseException:
+            if circuit_breaker is not None:
+                circuit_breaker.release()
+            raise
+        else:
+            if circuit_breaker is not None:
+                if response.status_code in UNAVAILABLE_STATUSES:
+                    circuit_breaker.record_failure()
+                else:
+                    circuit_breaker.record_success()
+            if (
+                not can_retry
+                or attempt >= retry_policy.max_retries
+                or response.status_code not in retry_policy.retry_statuses
+            ):
+                response.retries = attempt
+                response.total_elapsed = time.perf_counter() - started
+                return response
+            retry_after = retry_after_seconds(
+                response.headers.get("Retry-After")
+            )
+            response.close()
+        time.sleep(retry_policy.delay(attempt, retry_after))
+        attempt += 1
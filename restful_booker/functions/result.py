@@ -0,0 +1,48 @@
+import json
+
+_UNSET = object()
+
+
+class ApiResult:
+    """Ответ API, тело которого разбирается не больше одного раза.
+
+    Хранит исходные байты (content), модель pydantic, провалидированную
+    прямо из байтов через model_validate_json, и payload - JSON как он
+    пришел по сети, разобранный один раз при первом обращении. payload
+    никогда не строится из модели: модель приводит типы, а проверки
+    ответа должны видеть исходные данные.
+    retries и total_elapsed - число повторов и полное время вызова с
+    учетом задержек между повторами (см. functions/resilience.py).
+    Остальные атрибуты (status_code, request, headers, elapsed, ...)
+    берутся у исходного requests.Response.
+    """
+
+    def __init__(self, response):
+        self.response = response
+        self.content = response.content
+        self.status_code = response.status_code
+        self.retries = getattr(response, "retries", 0)
+        self.total_elapsed = getattr(
+            response, "total_elapsed", response.elapsed.total_seconds()
+        )
+        self.model = None
+        self._payload = _UNSET
+
+    def validate(self, model_type):
+        self.model = model_type.model_validate_json(self.content)
+        return self.model
+
+    @property
+    def payload(self):
+        if self._payload is _UNSET:
+            self._payload = json.loads(self.content)
+        return self._payload
+
+    def json(self):
+        return self.payload
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    def __repr__(self):
+        return f"<ApiResult [{self.status_code}]>"
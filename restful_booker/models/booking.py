@@ -0,0 +1,74 @@
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
+
+# YYYY-MM-DD с проверкой по календарю, включая 29 февраля високосных лет.
+# Шаблон проверяется внутри pydantic-core без вызова Python на каждое поле
+_YEAR = "([0-9]{3}[1-9]|[0-9]{2}[1-9][0-9]|[0-9][1-9][0-9]{2}|[1-9][0-9]{3})"
+_MONTH_DAY = (
+    "((0[13578]|1[02])-(0[1-9]|[12][0-9]|3[01])"
+    "|(0[469]|11)-(0[1-9]|[12][0-9]|30)"
+    "|02-(0[1-9]|1[0-9]|2[0-8]))"
+)
+_LEAP_YEAR = (
+    "([0-9]{2}(0[48]|[2468][048]|[13579][26])"
+    "|(0[48]|[2468][048]|[13579][26])00)"
+)
+DATE_PATTERN = f"^({_YEAR}-{_MONTH_DAY}|{_LEAP_YEAR}-02-29)$"
+
+
+class BookingDates(BaseModel):
+    checkin: str = Field(
+        ...,
+        pattern=DATE_PATTERN,
+        description="Дата заезда в формате YYYY-MM-DD",
+    )
+    checkout: str = Field(
+        ...,
+        pattern=DATE_PATTERN,
+        description="Дата выезда в формате YYYY-MM-DD",
+    )
+
+    @model_validator(mode="after")
+    def check_order(self) -> "BookingDates":
+        # Даты ISO одинаковой длины сравниваются как строки
+        if self.checkout < self.checkin:
+            raise ValueError(
+                f"Дата выезда {self.checkout} раньше даты заезда "
+                f"{self.checkin}"
+            )
+        return self
+
+
+class Booking(BaseModel):
+    firstname: str = Field(..., min_length=1, description="Имя")
+    lastname: str = Field(..., min_length=1, description="Фамилия")
+    totalprice: int = Field(..., gt=0, description="Общая стоимость")
+    depositpaid: bool = Field(..., description="Депозит оплачен")
+    bookingdates: BookingDates = Field(..., description="Даты бронирования")
+    additionalneeds: str = Field(..., description="Дополнительные потребности")
+
+    model_config = {"extra": "forbid"}
+
+
+# Валидация списка бронирований целиком из байтов JSON одним вызовом:
+# BookingList.validate_json(response.content)
+BookingList = TypeAdapter(list[Booking])
+
+
+class BookingResponse(BaseModel):
+    bookingid: int = Field(..., description="ID бронирования")
+    booking: Booking = Field(..., description="Данные бронирования")
+
+    model_config = {"extra": "forbid"}
+
+
+class BookingId(BaseModel):
+    bookingid: int = Field(..., description="ID бронирования")
+
+    model_config = {"extra": "forbid"}
+
+
+class AuthCredentials(BaseModel):
+    username: str = Field(..., min_length=1, description="Имя пользователя")
+    password: str = Field(..., min_length=1, description="Пароль")
+
+    model_config = {"extra": "forbid"}
@@ -0,0 +1,78 @@
+"""Генерация валидных бронирований для тестов и бенчмарков"""
+
+import random
+from datetime import date, timedelta
+
+from restful_booker.models.booking import Booking, BookingDates
+
+FIRST_NAMES = [
+    "Jim",
+    "Mary",
+    "Susan",
+    "Mark",
+    "Sally",
+    "Eric",
+    "John",
+    "Josh",
+]
+LAST_NAMES = [
+    "Brown",
+    "Jones",
+    "Wilson",
+    "Jackson",
+    "Ericsson",
+    "Smith",
+    "Allen",
+]
+ADDITIONAL_NEEDS = ["Breakfast", "Lunch", "Dinner", "Nothing"]
+
+FIRST_CHECKIN = date(2018, 1, 1)
+CHECKIN_RANGE_DAYS = 365 * 8
+MAX_STAY_DAYS = 30
+
+
+def make_bookings(n, seed=None, name_prefix=""):
+    """n валидных бронирований со случайными, но воспроизводимыми по seed
+    данными.
+
+    Значения генерируются сразу колонками, а модели собираются через
+    model_construct без повторной валидации: данные валидны по построению
+    (непустые имена, цена > 0, checkout позже checkin). name_prefix
+    добавляется и к имени, и к фамилии.
+    """
+    rng = random.Random(seed)
+    firstnames = rng.choices(FIRST_NAMES, k=n)
+    lastnames = rng.choices(LAST_NAMES, k=n)
+    prices = [rng.randint(1, 1000) for _ in range(n)]
+    deposits = [rng.random() < 0.5 for _ in range(n)]
+    needs = rng.choices(ADDITIONAL_NEEDS, k=n)
+    checkins = [
+        FIRST_CHECKIN + timedelta(days=rng.randrange(CHECKIN_RANGE_DAYS))
+        for _ in range(n)
+    ]
+    stays = [rng.randint(1, MAX_STAY_DAYS) for _ in range(n)]
+
+    return [
+        Booking.model_construct(
+            firstname=name_prefix + firstname,
+            lastname=name_prefix + lastname,
+            totalprice=price,
+            depositpaid=deposit,
+            bookingdates=BookingDates.model_construct(
+                checkin=checkin.isoformat(),
+                checkout=(checkin + timedelta(days=stay)).isoformat(),
+            ),
+            additionalneeds=need,
+        )
+        for firstname, lastname, price, deposit, need, checkin, stay in zip(
+            firstnames, lastnames, prices, deposits, needs, checkins, stays
+        )
+    ]
+
+
+def make_booking(seed=None, **overrides):
+    """Одно бронирование, поля из overrides проходят обычную валидацию"""
+    booking = make_bookings(1, seed=seed)[0]
+    if not overrides:
+        return booking
+    return Booking.model_validate({**booking.model_dump(), **overrides})
@@ -0,0 +1,506 @@
+"""Контрактный фаззинг POST/PUT/PATCH /booking.
+
+Кейсы строятся по ограничениям моделей из models/booking.py: для каждого
+поля - пропуск, неверный тип, значения на границе min_length и gt,
+некорректные даты, лишние поля при extra="forbid", а также checkout
+раньше checkin. Ожидаемый исход (accept/reject) для кейса дает сама
+модель Booking. Кейсы отправляются параллельно через асинхронный клиент,
+ответы классифицируются, все обмены пишутся в exchanges.jsonl.
+
+Сжатие падений выполняется без сети, по записанным обменам: для каждой
+группы падений (метод, мутация, исход) выбирается самый простой
+записанный пример.
+
+    python -m restful_booker.tools.fuzzer run --cases 5000 --concurrency 32 --seed 1
+    python -m restful_booker.tools.fuzzer shrink fuzz-results/exchanges.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urljoin
+
+from pydantic import BaseModel, ValidationError
+
+from restful_booker.functions.async_api_helper import (
+    DEFAULT_CONCURRENCY,
+    AsyncBookerClient,
+    gather_limited,
+)
+from restful_booker.functions.auth import get_token_provider
+from restful_booker.models.booking import Booking
+from restful_booker.models.factory import make_bookings
+from restful_booker.utils.booker_server import (
+    DEFAULT_PASSWORD,
+    DEFAULT_USER_NAME,
+    BookerServer,
+)
+from restful_booker.utils.logger import configure_response_logging
+from restful_booker.utils.settings import get_settings
+
+METHODS = ("POST", "PUT", "PATCH")
+VALID_SHARE = 0.3
+MAX_RESPONSE_SIZE = 500
+
+# Простейшее валидное бронирование: на нем повторяется каждая мутация,
+# чтобы при сжатии было из чего выбрать самый простой пример
+MINIMAL_BOOKING = {
+    "firstname": "a",
+    "lastname": "a",
+    "totalprice": 1,
+    "depositpaid": False,
+    "bookingdates": {"checkin": "2000-01-01", "checkout": "2000-01-01"},
+    "additionalneeds": "",
+}
+INVALID_DATES = [
+    "",
+    "2023-02-29",
+    "2023-13-01",
+    "2023-04-31",
+    "2023-1-1",
+    "0000-01-01",
+    "2023-01-01T00:00:00",
+    "01.01.2023",
+]
+BOUNDARY_DATES = ["2024-02-29", "2000-02-29", "0001-01-01", "9999-12-31"]
+# Значение неверного типа для поля каждого типа
+WRONG_TYPES = {str: 123, int: "abc", bool: "maybe"}
+
+OUTCOME_OK = "ok"
+OUTCOME_FALSE_ACCEPT = "false_accept"
+OUTCOME_FALSE_REJECT = "false_reject"
+OUTCOME_MISMATCH = "mismatch"
+OUTCOME_ERROR = "error"
+
+
+@dataclass(frozen=True)
+class Mutation:
+    """Изменение валидного тела: value по пути path или удаление поля"""
+
+    name: str
+    path: tuple
+    value: object = None
+    delete: bool = False
+
+    def apply(self, payload):
+        payload = json.loads(json.dumps(payload))
+        *parents, last = self.path
+        target = payload
+        for key in parents:
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            target = target[key]
+        if self.delete:
+            target.pop(last, None)
+        else:
+            target[last] = self.value
+        return payload
+
+    @property
+    def label(self):
+        return f"{self.name}:{'.'.join(self.path)}"
+
+
+def model_mutations(model=Booking, prefix=()):
+    """Мутации по ограничениям полей модели и ее вложенных моделей"""
+    mutations = []
+    for name, info in model.model_fields.items():
+        path = prefix + (name,)
+        annotation = info.annotation
+        if info.is_required():
+            mutations.append(Mutation("missing", path, delete=True))
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            mutations.append(Mutation("wrong_type", path, "not-an-object"))
+            mutations.extend(model_mutations(annotation, path))
+            continue
+        if annotation in WRONG_TYPES:
+            mutations.append(
+                Mutation("wrong_type", path, WRONG_TYPES[annotation])
+            )
+        for constraint in info.metadata:
+            min_length = getattr(constraint, "min_length", None)
+            if min_length is not None:
+                mutations.append(
+                    Mutation("too_short", path, "x" * (min_length - 1))
+                )
+                mutations.append(
+                    Mutation("min_length", path, "x" * min_length)
+                )
+            gt = getattr(constraint, "gt", None)
+            if gt is not None:
+                mutations.append(Mutation("not_greater", path, gt))
+                mutations.append(Mutation("not_greater", path, gt - 1))
+                mutations.append(Mutation("boundary", path, gt + 1))
+            pattern = getattr(constraint, "pattern", None)
+            if pattern is not None:
+                mutations.extend(
+                    Mutation("bad_date", path, value)
+                    for value in INVALID_DATES
+                )
+                mutations.extend(
+                    Mutation("boundary_date", path, value)
+                    for value in BOUNDARY_DATES
+                )
+    if model.model_config.get("extra") == "forbid":
+        mutations.append(Mutation("extra", prefix + ("unexpected",), 1))
+    return mutations
+
+
+def dates_reversed(payload):
+    """Правило валидатора BookingDates: checkout не раньше checkin"""
+    dates = payload.get("bookingdates")
+    if isinstance(dates, dict) and "checkin" in dates and "checkout" in dates:
+        dates["checkin"], dates["checkout"] = "2001-01-02", "2001-01-01"
+    return payload
+
+
+def expected_accept(payload):
+    try:
+        Booking.model_validate(payload)
+    except ValidationError:
+        return False
+    return True
+
+
+def merge_patch(current, changes):
+    """Тело после PATCH так, как его собирает сервис: вложенные даты
+    дополняются, остальные поля заменяются"""
+    merged = dict(current)
+    changes = dict(changes)
+    if isinstance(changes.get("bookingdates"), dict) and isinstance(
+        merged.get("bookingdates"), dict
+    ):
+        changes["bookingdates"] = {
+            **merged["bookingdates"],
+            **changes["bookingdates"],
+        }
+    merged.update(changes)
+    return merged
+
+
+@dataclass
+class Case:
+    number: int
+    method: str
+    mutation: str
+    payload: dict
+
+
+def generate_cases(count, seed=None):
+    """count кейсов, методы по кругу POST, PUT, PATCH"""
+    rng = random.Random(seed)
+    mutations = model_mutations()
+    bases = [booking.model_dump() for booking in make_bookings(64, seed=seed)]
+    cases = []
+    for number in range(count):
+        method = METHODS[number % len(METHODS)]
+        base = MINIMAL_BOOKING if rng.random() < 0.5 else rng.choice(bases)
+        if rng.random() < VALID_SHARE:
+            label, payload = "valid", json.loads(json.dumps(base))
+        elif rng.random() < 0.05:
+            label = "dates_reversed"
+            payload = dates_reversed(json.loads(json.dumps(base)))
+        else:
+            mutation = rng.choice(mutations)
+            label, payload = mutation.label, mutation.apply(base)
+        if method == "PATCH":
+            if label.startswith("missing:"):
+                # У PATCH отсутствующее поле - норма, а не ошибка
+                label = "valid"
+            top = (
+                "bookingdates"
+                if label == "dates_reversed"
+                else label.split(":", 1)[-1].split(".")[0]
+            )
+            key = top if top in payload else rng.choice(sorted(payload))
+            payload = {key: payload[key]} if key in payload else payload
+        cases.append(Case(number, method, label, payload))
+    return cases
+
+
+class ContractFuzzer:
+    """Параллельная отправка кейсов и классификация ответов.
+
+    PUT и PATCH идут в заранее созданные бронирования: у каждого
+    параллельного воркера свое, кейсы воркера выполняются по очереди,
+    поэтому ожидаемый исход PATCH считается от известного состояния.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        concurrency=DEFAULT_CONCURRENCY,
+        user_name=DEFAULT_USER_NAME,
+        password=DEFAULT_PASSWORD,
+    ):
+        self.base_url = base_url
+        self.booking_url = urljoin(base_url, "booking")
+        self.concurrency = concurrency
+        self.token = get_token_provider(
+            urljoin(base_url, "auth"), user_name, password
+        )
+        self.exchanges = []
+        self.created_ids = []
+
+    def run(self, cases):
+        started = time.monotonic()
+        asyncio.run(self._run(cases))
+        elapsed = time.monotonic() - started
+        outcomes = Counter(exchange["outcome"] for exchange in self.exchanges)
+        return {
+            "base_url": self.base_url,
+            "cases": len(self.exchanges),
+            "elapsed_s": elapsed,
+            "cases_per_minute": len(self.exchanges) / elapsed * 60,
+            "outcomes": dict(outcomes),
+            "by_method": {
+                method: dict(
+                    Counter(
+                        exchange["outcome"]
+                        for exchange in self.exchanges
+                        if exchange["method"] == method
+                    )
+                )
+                for method in METHODS
+            },
+        }
+
+    async def _run(self, cases):
+        async with AsyncBookerClient(
+            max_connections=self.concurrency
+        ) as client:
+            targets = await client.create_bookings(
+                self.booking_url,
+                make_bookings(self.concurrency, seed=0),
+                concurrency=self.concurrency,
+            )
+            states = [response.json() for response in targets]
+            self.created_ids.extend(state["bookingid"] for state in states)
+            lanes = [
+                cases[index :: self.concurrency]
+                for index in range(self.concurrency)
+            ]
+            await gather_limited(
+                (
+                    self._run_lane(client, lane, state["bookingid"], state)
+                    for lane, state in zip(lanes, states)
+                ),
+                self.concurrency,
+            )
+            await client.delete_bookings(
+                self.token,
+                [
+                    f"{self.booking_url}/{booking_id}"
+                    for booking_id in self.created_ids
+                ],
+                concurrency=self.concurrency,
+            )
+
+    async def _run_lane(self, client, cases, target_id, state):
+        current = state["booking"]
+        target_url = f"{self.booking_url}/{target_id}"
+        for case in cases:
+            if case.method == "POST":
+                expected_payload = case.payload
+                url, token = self.booking_url, None
+            elif case.method == "PUT":
+                expected_payload = case.payload
+                url, token = target_url, self.token
+            else:
+                expected_payload = merge_patch(current, case.payload)
+                url, token = target_url, self.token
+            expected = expected_accept(expected_payload)
+
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    case.method, url, token=token, json=case.payload
+                )
+            except Exception as error:
+                self._record(case, expected, None, repr(error), OUTCOME_ERROR)
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            outcome = classify(
+                expected, expected_payload, case.method, response
+            )
+            if response.status_code == 200:
+                body = response.json()
+                if case.method == "POST":
+                    self.created_ids.append(body["bookingid"])
+                else:
+                    current = body
+            self._record(
+                case,
+                expected,
+                response.status_code,
+                response.text[:MAX_RESPONSE_SIZE],
+                outcome,
+                elapsed_ms,
+            )
+
+    def _record(
+        self, case, expected, status, response, outcome, elapsed_ms=None
+    ):
+        self.exchanges.append(
+            {
+                "case": case.number,
+                "method": case.method,
+                "mutation": case.mutation,
+                "payload": case.payload,
+                "expected": "accept" if expected else "reject",
+                "status": status,
+                "response": response,
+                "outcome": outcome,
+                "elapsed_ms": elapsed_ms,
+            }
+        )
+
+
+def classify(expected, expected_payload, method, response):
+    """Сравнение ответа с ожидаемым исходом. Отказ - 400 или 500 (так
+    Restful Booker отвечает на некорректное тело), остальные коды -
+    ошибка фаззинга, например 403 или 405"""
+    status = response.status_code
+    if status == 200:
+        if not expected:
+            return OUTCOME_FALSE_ACCEPT
+        try:
+            body = response.json()
+        except ValueError:
+            return OUTCOME_MISMATCH
+        booking = body.get("booking") if method == "POST" else body
+        sent = Booking.model_validate(expected_payload).model_dump()
+        return OUTCOME_OK if booking == sent else OUTCOME_MISMATCH
+    if status in (400, 500):
+        return OUTCOME_FALSE_REJECT if expected else OUTCOME_OK
+    return OUTCOME_ERROR
+
+
+def write_exchanges(exchanges, path):
+    with open(path, "w") as file:
+        for exchange in exchanges:
+            file.write(json.dumps(exchange, ensure_ascii=False) + "\n")
+
+
+def read_exchanges(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def shrink(exchanges):
+    """Самый простой записанный пример для каждой группы падений.
+
+    Группа - метод, мутация и исход. Простота - длина тела в JSON, при
+    равенстве - номер кейса. Повторной отправки нет: сжатие работает
+    только по уже записанным обменам.
+    """
+    groups = {}
+    for exchange in exchanges:
+        if exchange["outcome"] == OUTCOME_OK:
+            continue
+        key = (exchange["method"], exchange["mutation"], exchange["outcome"])
+        groups.setdefault(key, []).append(exchange)
+    shrunk = []
+    for (method, mutation, outcome), failures in sorted(groups.items()):
+        witness = min(
+            failures,
+            key=lambda exchange: (
+                len(json.dumps(exchange["payload"])),
+                exchange["case"],
+            ),
+        )
+        shrunk.append(
+            {
+                "method": method,
+                "mutation": mutation,
+                "outcome": outcome,
+                "count": len(failures),
+                "payload": witness["payload"],
+                "expected": witness["expected"],
+                "status": witness["status"],
+                "response": witness["response"],
+            }
+        )
+    return shrunk
+
+
+def print_shrunk(shrunk):
+    if not shrunk:
+        print("Расхождений с контрактом нет")
+    for failure in shrunk:
+        print(
+            f"{failure['method']:<6} {failure['mutation']:<40} "
+            f"{failure['outcome']:<13} x{failure['count']}: "
+            f"{json.dumps(failure['payload'], ensure_ascii=False)} -> "
+            f"{failure['status']}"
+        )
+
+
+def main(argv=None):
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Сгенерировать и отправить")
+    run_parser.add_argument(
+        "--base-url",
+        default=settings.base_url,
+        help="По умолчанию BASE_URL, без него - локальная замена сервиса",
+    )
+    run_parser.add_argument("--cases", type=int, default=3000)
+    run_parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY
+    )
+    run_parser.add_argument("--seed", type=int, default=None)
+    run_parser.add_argument("--output", default="fuzz-results")
+    shrink_parser = subparsers.add_parser(
+        "shrink", help="Сжать падения из записанных обменов"
+    )
+    shrink_parser.add_argument("exchanges")
+    args = parser.parse_args(argv)
+    configure_response_logging(settings=settings)
+
+    if args.command == "shrink":
+        shrunk = shrink(read_exchanges(args.exchanges))
+        print_shrunk(shrunk)
+        return shrunk
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = BookerServer().start()
+        base_url = server.url
+    try:
+        fuzzer = ContractFuzzer(
+            base_url,
+            concurrency=args.concurrency,
+            user_name=settings.user_name,
+            password=settings.password,
+        )
+        summary = fuzzer.run(generate_cases(args.cases, seed=args.seed))
+    finally:
+        if server is not None:
+            server.stop()
+
+    write_exchanges(fuzzer.exchanges, output_dir / "exchanges.jsonl")
+    shrunk = shrink(fuzzer.exchanges)
+    summary["failures"] = shrunk
+    with open(output_dir / "summary.json", "w") as file:
+        json.dump(summary, file, indent=4, ensure_ascii=False)
+    print(
+        f"{summary['cases']} кейсов за {summary['elapsed_s']:.1f} с "
+        f"({summary['cases_per_minute']:.0f} в минуту): {summary['outcomes']}"
+    )
+    print_shrunk(shrunk)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
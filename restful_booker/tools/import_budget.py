@@ -0,0 +1,288 @@
+"""Проверка времени импорта модулей проекта через python -X importtime.
+
+Каждый модуль импортируется в отдельном чистом интерпретаторе (как в
+коротком воркере xdist или шарде CI) --repeat раз, берется лучший
+результат. Проверка не проходит, если время импорта выше бюджета или
+модуль тянет за собой зависимости, которые должны импортироваться лениво
+(allure, jsonschema, dotenv, а для синхронного стека еще и httpx).
+Так же замеряется сбор тестов (pytest --collect-only): conftest не
+должен тянуть httpx, jsonschema, sqlite3 и restful_booker.tools:
+
+    python -m restful_booker.tools.import_budget
+    python -m restful_booker.tools.import_budget --scale 2
+    python -m restful_booker.tools.import_budget \\
+        --module restful_booker.utils.logger=150
+    python -m restful_booker.tools.import_budget --collect tests/api=5000
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_REPEAT = 5
+TOP_IMPORTS = 5
+
+# Бюджет в миллисекундах с запасом примерно вдвое к замерам на машине
+# разработчика; pydantic и requests - основная часть любого из них
+IMPORT_BUDGETS = {
+    "restful_booker.utils.settings": 40,
+    "restful_booker.models.booking": 250,
+    "restful_booker.functions.client": 250,
+    "restful_booker.functions.api_helper": 450,
+    "restful_booker.functions.async_api_helper": 600,
+    "restful_booker.utils.logger": 200,
+    "restful_booker.utils.schema_registry": 350,
+    "restful_booker.utils.booker_server": 400,
+    "restful_booker.tools.load_runner": 500,
+    "restful_booker.tools.mirror": 500,
+    "restful_booker.tools.soak": 500,
+    "restful_booker.tools.fuzzer": 500,
+}
+# Нужны только в момент использования: вложения Allure, проверка схем,
+# чтение .env в get_settings
+LAZY_IMPORTS = ("allure", "allure_commons", "jsonschema", "dotenv")
+# Модули синхронного стека, которым не нужен httpx
+SYNC_MODULES = {
+    "restful_booker.functions.client",
+    "restful_booker.functions.api_helper",
+    "restful_booker.utils.logger",
+    "restful_booker.tools.load_runner",
+    "restful_booker.tools.mirror",
+    "restful_booker.tools.soak",
+}
+# Полное время pytest --collect-only с запуском интерпретатора и pytest,
+# тоже примерно вдвое к замерам
+COLLECTION_BUDGETS = {
+    "tests/api": 3500,
+}
+# Нужны только фикстурам, которые их используют: пул бронирований
+# (httpx), зеркало (sqlite3), проверка схем. allure при сборе тянет сам
+# плагин allure-pytest, dotenv - get_settings в pytest_addoption
+COLLECTION_LAZY_IMPORTS = (
+    "httpx",
+    "jsonschema",
+    "sqlite3",
+    "restful_booker.tools",
+)
+
+
+@dataclass
+class ImportProfile:
+    """Один импорт module: полное время и время прямых зависимостей"""
+
+    module: str
+    total_us: int
+    imported: set = field(default_factory=set)
+    children: list = field(default_factory=list)
+
+
+def _import_lines(output):
+    """Строки stderr python -X importtime "import time: self |
+    cumulative | name" как (глубина, имя, cumulative в мкс). Отступ имени -
+    глубина вложенности, строки идут в порядке завершения импорта, то есть
+    дети раньше родителя"""
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        yield depth, name.strip(), int(cumulative)
+
+
+def parse_importtime(output, module):
+    """Профиль импорта module из вывода python -X importtime"""
+    imported = set()
+    pending = []
+    for depth, name, cumulative in _import_lines(output):
+        imported.add(name)
+        if depth == 1:
+            pending.append((name, cumulative))
+        elif depth == 0:
+            if name == module:
+                children = sorted(pending, key=lambda item: -item[1])
+                return ImportProfile(module, cumulative, imported, children)
+            pending = []
+    raise ValueError(f"В выводе importtime нет импорта {module}")
+
+
+def profile_import(module, python=sys.executable):
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode:
+        raise RuntimeError(
+            f"Не удалось импортировать {module}:\n{completed.stderr}"
+        )
+    return parse_importtime(completed.stderr, module)
+
+
+def profile_collection(path, python=sys.executable):
+    """Сбор тестов path в чистом интерпретаторе: полное время pytest
+    --collect-only и все импортированные при этом модули. -s нужен, чтобы
+    pytest не перехватил stderr с выводом importtime"""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [
+            python,
+            "-X",
+            "importtime",
+            "-m",
+            "pytest",
+            "--collect-only",
+            "-q",
+            "-s",
+            "-p",
+            "no:cacheprovider",
+            path,
+        ],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    elapsed_us = int((time.perf_counter() - started) * 1_000_000)
+    if completed.returncode:
+        raise RuntimeError(
+            f"Не удалось собрать тесты {path}:\n{completed.stdout}"
+        )
+    imported = set()
+    roots = []
+    for depth, name, cumulative in _import_lines(completed.stderr):
+        imported.add(name)
+        if depth == 0:
+            roots.append((name, cumulative))
+    roots.sort(key=lambda item: -item[1])
+    return ImportProfile(path, elapsed_us, imported, roots)
+
+
+def lazy_violations(module, imported, forbidden=None):
+    """Импортированные модулем зависимости, которые должны быть ленивыми:
+    пакеты из forbidden или любые их подмодули"""
+    if forbidden is None:
+        forbidden = LAZY_IMPORTS + (
+            ("httpx",) if module in SYNC_MODULES else ()
+        )
+    return sorted(
+        package
+        for package in forbidden
+        if any(
+            name == package or name.startswith(f"{package}.")
+            for name in imported
+        )
+    )
+
+
+def check_budgets(budgets, repeat=DEFAULT_REPEAT, scale=1.0):
+    """Строка отчета на модуль: лучшее время, бюджет, лишние импорты"""
+    return [
+        _budget_row(
+            module,
+            [profile_import(module) for _ in range(repeat)],
+            budget_ms,
+            scale,
+        )
+        for module, budget_ms in budgets.items()
+    ]
+
+
+def check_collection(budgets, repeat=DEFAULT_REPEAT, scale=1.0):
+    """Строка отчета на каталог тестов: лучшее время сбора, бюджет,
+    лишние импорты"""
+    return [
+        _budget_row(
+            path,
+            [profile_collection(path) for _ in range(repeat)],
+            budget_ms,
+            scale,
+            COLLECTION_LAZY_IMPORTS,
+        )
+        for path, budget_ms in budgets.items()
+    ]
+
+
+def _budget_row(module, profiles, budget_ms, scale, forbidden=None):
+    best = min(profiles, key=lambda profile: profile.total_us)
+    violations = lazy_violations(module, best.imported, forbidden)
+    limit_ms = budget_ms * scale
+    return {
+        "module": module,
+        "best_ms": best.total_us / 1000,
+        "budget_ms": limit_ms,
+        "lazy_violations": violations,
+        "top_imports": best.children[:TOP_IMPORTS],
+        "ok": best.total_us / 1000 <= limit_ms and not violations,
+    }
+
+
+def print_report(rows):
+    print(f"{'module':<44} {'best ms':>8} {'budget':>8}  status")
+    for row in rows:
+        status = "ok" if row["ok"] else "FAIL"
+        print(
+            f"{row['module']:<44} {row['best_ms']:>8.1f} "
+            f"{row['budget_ms']:>8.1f}  {status}"
+        )
+        if row["lazy_violations"]:
+            print(f"    лишние импорты: {', '.join(row['lazy_violations'])}")
+        if not row["ok"]:
+            for name, cumulative in row["top_imports"]:
+                print(f"    {name:<24} {cumulative / 1000:>8.1f} ms")
+
+
+def _module_budget(value):
+    module, _, budget = value.partition("=")
+    if not budget:
+        raise argparse.ArgumentTypeError("Ожидается имя=миллисекунды")
+    return module, float(budget)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Множитель бюджетов для медленных машин CI",
+    )
+    parser.add_argument(
+        "--module",
+        type=_module_budget,
+        action="append",
+        default=[],
+        help="Проверить только указанные модули: модуль=миллисекунды",
+    )
+    parser.add_argument(
+        "--collect",
+        type=_module_budget,
+        action="append",
+        default=[],
+        help="Проверить только сбор указанных тестов: путь=миллисекунды",
+    )
+    args = parser.parse_args(argv)
+
+    budgets = dict(args.module)
+    collection_budgets = dict(args.collect)
+    if not budgets and not collection_budgets:
+        budgets = IMPORT_BUDGETS
+        collection_budgets = COLLECTION_BUDGETS
+    rows = check_budgets(budgets, repeat=args.repeat, scale=args.scale)
+    rows += check_collection(
+        collection_budgets, repeat=args.repeat, scale=args.scale
+    )
+    print_report(rows)
+    return 0 if all(row["ok"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""Нагрузочный прогон CRUD сценария Restful Booker.
+
+Сценарий повторяет тесты из tests/api/test_booking.py: создание ->
+получение -> обновление всех полей -> обновление одного поля -> удаление
+-> проверка 404. Сценарии крутятся в concurrency потоках заданное время,
+опционально с ограничением общей частоты запросов (--rps). По итогам
+пишутся JSON с p50/p95/p99, пропускной способностью и долей ошибок по
+каждому эндпоинту и распределение задержек в формате HdrHistogram.
+--booking-cache-ttl включает кэш GET /booking/{id} (по умолчанию
+выключен), его счетчики попадают в отчет.
+
+    python -m restful_booker.tools.load_runner --duration 60 --concurrency 20 --rps 100
+"""
+
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+from restful_booker.functions.api_helper import (
+    change_all_fields_in_booking,
+    change_one_fields_in_booking,
+    create_booking,
+    create_url_to_get_booking_by_id,
+    delete_booking,
+    get_booking_by_id,
+    get_id_new_booking,
+)
+from restful_booker.functions.auth import TokenProvider
+from restful_booker.functions.booking_cache import BookingCache
+from restful_booker.functions.client import BookerClient
+from restful_booker.models.booking import Booking, BookingDates
+from restful_booker.utils.booker_server import (
+    DEFAULT_PASSWORD,
+    DEFAULT_USER_NAME,
+    BookerServer,
+)
+from restful_booker.utils.logger import configure_response_logging
+from restful_booker.utils.metrics import EndpointStats
+from restful_booker.utils.settings import get_settings
+
+BOOKING_FOR_CREATE = Booking(
+    firstname="Jim",
+    lastname="Brown",
+    totalprice=111,
+    depositpaid=True,
+    bookingdates=BookingDates(checkin="2018-01-01", checkout="2019-01-01"),
+    additionalneeds="Breakfast",
+)
+BOOKING_WITH_CHANGE = Booking(
+    firstname="Jim-Josef",
+    lastname="Brown-Smith",
+    totalprice=222,
+    depositpaid=False,
+    bookingdates=BookingDates(checkin="2018-05-01", checkout="2019-05-01"),
+    additionalneeds="Breakfast and wc in room",
+)
+FIELD_WITH_CHANGE = {"additionalneeds": "Nothing"}
+
+
+class Pacer:
+    """Раздает потокам моменты старта запросов по расписанию rps в секунду.
+
+    Расписание не сдвигается, если потоки не успевают: запрос, чей слот
+    уже прошел, отправляется сразу, а его задержка считается от слота.
+    Иначе время ожидания свободного потока выпало бы из замеров
+    (coordinated omission).
+    """
+
+    def __init__(self, rps):
+        self.interval = 1.0 / rps
+        self._next_slot = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Ожидание своего слота, возвращает его время (perf_counter)"""
+        with self._lock:
+            slot = self._next_slot
+            self._next_slot = slot + self.interval
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        return slot
+
+
+class LoadRunner:
+    def __init__(
+        self,
+        base_url,
+        duration_s=60.0,
+        concurrency=10,
+        rps=None,
+        user_name=DEFAULT_USER_NAME,
+        password=DEFAULT_PASSWORD,
+        booking_cache_ttl=0.0,
+    ):
+        self.base_url = base_url
+        self.duration_s = duration_s
+        self.concurrency = concurrency
+        self.pacer = Pacer(rps) if rps else None
+        self.rps = rps
+        # Без повторов и размыкателя: ошибки и задержки сервиса должны
+        # попасть в статистику как есть
+        self.client = BookerClient(
+            pool_connections=1,
+            pool_maxsize=concurrency,
+            retry_policy=None,
+            circuit_breaker=None,
+            booking_cache=(
+                BookingCache(ttl=booking_cache_ttl)
+                if booking_cache_ttl > 0
+                else None
+            ),
+        )
+        self.token = TokenProvider(
+            urljoin(base_url, "auth"), user_name, password, client=self.client
+        )
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self.scenarios = 0
+        self.failed_scenarios = 0
+
+    def run(self):
+        self.token.get_token()
+        stop_at = time.monotonic() + self.duration_s
+        started = time.monotonic()
+        workers = [
+            threading.Thread(target=self._worker, args=(stop_at,))
+            for _ in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.monotonic() - started
+        self.client.close()
+        return self.summary(elapsed)
+
+    def summary(self, elapsed_s):
+        total = EndpointStats()
+        for stats in self.stats.values():
+            total.histogram.merge(stats.histogram)
+            total.errors += stats.errors
+        return {
+            "base_url": self.base_url,
+            "duration_s": elapsed_s,
+            "concurrency": self.concurrency,
+            "target_rps": self.rps,
+            # С --rps задержка считается от запланированного старта и
+            # включает ожидание в очереди, без него - чистое время ответа
+            "latency_from": "scheduled" if self.pacer else "sent",
+            "scenarios": self.scenarios,
+            "failed_scenarios": self.failed_scenarios,
+            "endpoints": {
+                name: stats.summary(elapsed_s)
+                for name, stats in sorted(self.stats.items())
+            },
+            "total": total.summary(elapsed_s),
+            "booking_cache": (
+                self.client.booking_cache.stats()
+                if self.client.booking_cache is not None
+                else None
+            ),
+        }
+
+    def _worker(self, stop_at):
+        while time.monotonic() < stop_at:
+            ok = self._run_scenario()
+            with self._stats_lock:
+                self.scenarios += 1
+                if not ok:
+                    self.failed_scenarios += 1
+
+    def _run_scenario(self):
+        url = urljoin(self.base_url, "booking")
+        response = self._step(
+            "POST /booking",
+            200,
+            create_booking,
+            url,
+            BOOKING_FOR_CREATE,
+            client=self.client,
+        )
+        if response is None:
+            return False
+        url_booking_id = create_url_to_get_booking_by_id(
+            url, get_id_new_booking(response)
+        )
+        steps = [
+            ("GET /booking/{id}", 200, get_booking_by_id, url_booking_id),
+            (
+                "PUT /booking/{id}",
+                200,
+                change_all_fields_in_booking,
+                self.token,
+                url_booking_id,
+                BOOKING_WITH_CHANGE,
+            ),
+            (
+                "PATCH /booking/{id}",
+                200,
+                change_one_fields_in_booking,
+                self.token,
+                url_booking_id,
+                FIELD_WITH_CHANGE,
+            ),
+            (
+                "DELETE /booking/{id}",
+                201,
+                delete_booking,
+                self.token,
+                url_booking_id,
+            ),
+            ("GET /booking/{id}", 404, get_booking_by_id, url_booking_id),
+        ]
+        for name, expected_status, helper, *args in steps:
+            response = self._step(
+                name, expected_status, helper, *args, client=self.client
+            )
+            if response is None:
+                return False
+        return True
+
+    def _step(self, name, expected_status, helper, *args, **kwargs):
+        """Замер одного вызова helper; None, если вызов неуспешен"""
+        if self.pacer is not None:
+            started = self.pacer.wait()
+        else:
+            started = time.perf_counter()
+        try:
+            response = helper(*args, **kwargs)
+            ok = response.status_code == expected_status
+        except Exception:
+            response, ok = None, False
+        self._stats(name).record(time.perf_counter() - started, ok=ok)
+        return response if ok else None
+
+    def _stats(self, name):
+        stats = self.stats.get(name)
+        if stats is None:
+            with self._stats_lock:
+                stats = self.stats.setdefault(name, EndpointStats())
+        return stats
+
+
+def write_report(runner, summary, output_dir):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / "summary.json", "w") as file:
+        json.dump(summary, file, indent=4, ensure_ascii=False)
+    with open(output_dir / "latency_histograms.txt", "w") as file:
+        for name, stats in sorted(runner.stats.items()):
+            file.write(f"# {name}\n")
+            file.write(stats.histogram.format_distribution())
+            file.write("\n")
+
+
+def print_summary(summary):
+    if summary["latency_from"] == "scheduled":
+        print("Задержки считаются от запланированного старта запроса")
+    else:
+        print("Задержки - время ответа сервиса без ожидания в очереди")
+    print(
+        f"{'endpoint':<22} {'count':>7} {'err%':>6} {'rps':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    rows = list(summary["endpoints"].items()) + [("total", summary["total"])]
+    for name, row in rows:
+        print(
+            f"{name:<22} {row['count']:>7} {row['error_rate'] * 100:>6.2f} "
+            f"{row['throughput_rps']:>8.1f} {row['p50_ms']:>8.2f} "
+            f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f}"
+        )
+    cache = summary["booking_cache"]
+    if cache is not None:
+        print(
+            f"Кэш бронирований: попаданий {cache['hits']}, промахов "
+            f"{cache['misses']}, перепроверок {cache['revalidated']}"
+        )
+
+
+def main(argv=None):
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--base-url",
+        default=settings.base_url,
+        help="По умолчанию BASE_URL, без него - локальная замена сервиса",
+    )
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--rps", type=float, default=None, help="Целевая частота запросов"
+    )
+    parser.add_argument(
+        "--booking-cache-ttl",
+        type=float,
+        default=0.0,
+        help="TTL кэша GET /booking/{id} в секундах, 0 - без кэша",
+    )
+    parser.add_argument("--output", default="load-results")
+    args = parser.parse_args(argv)
+    configure_response_logging(settings=settings)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = BookerServer().start()
+        base_url = server.url
+    try:
+        runner = LoadRunner(
+            base_url,
+            duration_s=args.duration,
+            concurrency=args.concurrency,
+            rps=args.rps,
+            user_name=settings.user_name,
+            password=settings.password,
+            booking_cache_ttl=args.booking_cache_ttl,
+        )
+        summary = runner.run()
+    finally:
+        if server is not None:
+            server.stop()
+    write_report(runner, summary, args.output)
+    print_summary(summary)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
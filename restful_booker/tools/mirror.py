@@ -0,0 +1,347 @@
+"""Локальное зеркало бронирований Restful Booker в SQLite.
+
+Первая синхронизация скачивает детали всех бронирований, следующие -
+сверяют список ID из GET /booking с зеркалом: удаленные на сервисе
+бронирования удаляются, детали запрашиваются параллельно только для
+новых (и не скачавшихся в прошлый раз) ID. Изменения уже известных
+бронирований так не видны, для них есть --refresh.
+
+Зеркало отвечает на вопросы вида "какие бронирования подходят под
+фильтр" без запросов к сервису:
+
+    python -m restful_booker.tools.mirror sync --base-url $BASE_URL
+    python -m restful_booker.tools.mirror query --db booker_mirror.sqlite3 --checkin 2024-01-01
+"""
+
+import argparse
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urljoin
+
+from restful_booker.functions.api_helper import iter_booking_ids
+from restful_booker.functions.filter_planner import BookingFilter
+from restful_booker.functions.filter_verifier import (
+    DEFAULT_WORKERS,
+    fetch_bookings,
+)
+from restful_booker.models.booking import Booking, BookingDates
+from restful_booker.utils.logger import configure_response_logging
+from restful_booker.utils.settings import get_settings
+
+DEFAULT_DB_PATH = "booker_mirror.sqlite3"
+SYNC_BATCH_SIZE = 500
+
+# Колонки строятся по модели Booking: вложенные даты - плоскими колонками
+_SQL_TYPES = {str: "TEXT", int: "INTEGER", bool: "INTEGER"}
+BOOKING_COLUMNS = [
+    name for name in Booking.model_fields if name != "bookingdates"
+] + list(BookingDates.model_fields)
+_COLUMN_TYPES = {
+    name: _SQL_TYPES[model.model_fields[name].annotation]
+    for model in (Booking, BookingDates)
+    for name in model.model_fields
+    if name != "bookingdates"
+}
+INDEXED_COLUMNS = ("firstname", "lastname", "checkin", "checkout")
+
+
+@dataclass
+class SyncReport:
+    """Итог одной синхронизации"""
+
+    run_id: int
+    total: int
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    failed: list = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+
+class BookingMirror:
+    """Зеркало бронирований одного сервиса в файле path.
+
+    Если зеркало раньше синхронизировалось с другим base_url, при sync оно
+    очищается и наполняется заново.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = ",\n".join(
+            f"{name} {_COLUMN_TYPES[name]} NOT NULL"
+            for name in BOOKING_COLUMNS
+        )
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_runs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "started_at REAL NOT NULL, base_url TEXT NOT NULL, "
+                "total INTEGER NOT NULL, added INTEGER NOT NULL, "
+                "removed INTEGER NOT NULL, failed INTEGER NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS bookings ("
+                "bookingid INTEGER PRIMARY KEY, "
+                f"{columns}, "
+                "sync_run INTEGER NOT NULL, "
+                "first_seen_run INTEGER NOT NULL)"
+            )
+            known = {
+                row[1]
+                for row in self.connection.execute(
+                    "PRAGMA table_info(bookings)"
+                )
+            }
+            if "first_seen_run" not in known:
+                # Зеркало от прошлой версии: первым считается последний
+                # прогон, в котором бронирование скачивалось
+                self.connection.execute(
+                    "ALTER TABLE bookings ADD COLUMN "
+                    "first_seen_run INTEGER NOT NULL DEFAULT 0"
+                )
+                self.connection.execute(
+                    "UPDATE bookings SET first_seen_run = sync_run"
+                )
+            for column in INDEXED_COLUMNS:
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS bookings_{column} "
+                    f"ON bookings ({column})"
+                )
+
+    def sync(
+        self, base_url, workers=DEFAULT_WORKERS, client=None, refresh=False
+    ):
+        """Догрузка зеркала до текущего состояния сервиса"""
+        started = time.time()
+        self._bind(base_url)
+        remote_ids = set(
+            iter_booking_ids(urljoin(base_url, "booking"), client=client)
+        )
+        local_ids = self.ids()
+        removed = sorted(local_ids - remote_ids)
+        to_fetch = sorted(remote_ids if refresh else remote_ids - local_ids)
+
+        with self.connection:
+            run_id = self.connection.execute(
+                "INSERT INTO sync_runs "
+                "(started_at, base_url, total, added, removed, failed) "
+                "VALUES (?, ?, 0, 0, 0, 0)",
+                (started, base_url),
+            ).lastrowid
+            self.connection.executemany(
+                "DELETE FROM bookings WHERE bookingid = ?",
+                [(booking_id,) for booking_id in removed],
+            )
+
+        report = SyncReport(run_id=run_id, total=0, removed=removed)
+        # Пачками, чтобы прерванная синхронизация не теряла скачанное
+        for start in range(0, len(to_fetch), SYNC_BATCH_SIZE):
+            batch = to_fetch[start : start + SYNC_BATCH_SIZE]
+            bookings = fetch_bookings(base_url, batch, workers, client)
+            self._store(bookings, run_id)
+            report.added.extend(
+                booking_id
+                for booking_id in batch
+                if booking_id in bookings and booking_id not in local_ids
+            )
+            report.failed.extend(
+                booking_id
+                for booking_id in batch
+                if booking_id not in bookings
+            )
+
+        report.total = len(self)
+        report.elapsed_s = time.time() - started
+        with self.connection:
+            self.connection.execute(
+                "UPDATE sync_runs SET total = ?, added = ?, removed = ?, "
+                "failed = ? WHERE id = ?",
+                (
+                    report.total,
+                    len(report.added),
+                    len(report.removed),
+                    len(report.failed),
+                    run_id,
+                ),
+            )
+        return report
+
+    def _bind(self, base_url):
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'base_url'"
+        ).fetchone()
+        if row is not None and row[0] == base_url:
+            return
+        with self.connection:
+            self.connection.execute("DELETE FROM bookings")
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) "
+                "VALUES ('base_url', ?)",
+                (base_url,),
+            )
+
+    def _store(self, bookings, run_id):
+        placeholders = ", ".join("?" for _ in BOOKING_COLUMNS)
+        rows = []
+        # Детали уже провалидированы моделью Booking в get_booking_by_id
+        for booking_id, payload in bookings.items():
+            row = {**payload, **payload["bookingdates"]}
+            rows.append(
+                (
+                    booking_id,
+                    *(row[name] for name in BOOKING_COLUMNS),
+                    run_id,
+                    run_id,
+                )
+            )
+        updates = ", ".join(
+            f"{name} = excluded.{name}"
+            for name in (*BOOKING_COLUMNS, "sync_run")
+        )
+        # При перезапросе (--refresh) first_seen_run не меняется
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO bookings "
+                f"(bookingid, {', '.join(BOOKING_COLUMNS)}, sync_run, "
+                f"first_seen_run) "
+                f"VALUES (?, {placeholders}, ?, ?) "
+                f"ON CONFLICT (bookingid) DO UPDATE SET {updates}",
+                rows,
+            )
+
+    def ids(self):
+        return {
+            row[0]
+            for row in self.connection.execute(
+                "SELECT bookingid FROM bookings"
+            )
+        }
+
+    def get(self, booking_id):
+        row = self.connection.execute(
+            f"SELECT {', '.join(BOOKING_COLUMNS)} FROM bookings "
+            "WHERE bookingid = ?",
+            (booking_id,),
+        ).fetchone()
+        return None if row is None else _to_booking(row)
+
+    def query(self, booking_filter: BookingFilter):
+        """ID, подходящие под фильтр по правилам GET /booking: имена
+        точно, checkin и checkout - больше или равно"""
+        conditions = []
+        values = []
+        for name, value in booking_filter.params().items():
+            operator = ">=" if name in ("checkin", "checkout") else "="
+            conditions.append(f"{name} {operator} ?")
+            values.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return {
+            row[0]
+            for row in self.connection.execute(
+                f"SELECT bookingid FROM bookings{where}", values
+            )
+        }
+
+    def added_since(self, run_id):
+        """ID, впервые появившиеся в зеркале после синхронизации run_id.
+
+        Перезапрошенные через --refresh бронирования сюда не попадают.
+        """
+        return {
+            row[0]
+            for row in self.connection.execute(
+                "SELECT bookingid FROM bookings WHERE first_seen_run > ?",
+                (run_id,),
+            )
+        }
+
+    def last_run(self):
+        row = self.connection.execute(
+            "SELECT id FROM sync_runs ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM bookings"
+        ).fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _to_booking(row):
+    values = dict(zip(BOOKING_COLUMNS, row))
+    dates = {name: values.pop(name) for name in BookingDates.model_fields}
+    values["depositpaid"] = bool(values["depositpaid"])
+    return Booking.model_construct(
+        **values, bookingdates=BookingDates.model_construct(**dates)
+    )
+
+
+def main(argv=None):
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("sync", "query"))
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument(
+        "--base-url",
+        default=settings.base_url,
+        help="По умолчанию BASE_URL, для sync обязателен",
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Перезапросить детали всех бронирований, а не только новых",
+    )
+    for name in INDEXED_COLUMNS:
+        parser.add_argument(f"--{name}")
+    args = parser.parse_args(argv)
+    if args.command == "sync" and not args.base_url:
+        # Локальная замена сервиса на случайном порту каждый раз давала бы
+        # новый base_url, и зеркало очищалось бы при каждой синхронизации
+        parser.error("для sync нужен --base-url или BASE_URL")
+    configure_response_logging(settings=settings)
+
+    with BookingMirror(args.db) as mirror:
+        if args.command == "query":
+            booking_filter = BookingFilter(
+                **{name: getattr(args, name) for name in INDEXED_COLUMNS}
+            )
+            ids = sorted(mirror.query(booking_filter))
+            print(f"{len(ids)} бронирований по фильтру {booking_filter}")
+            for booking_id in ids:
+                print(booking_id)
+            return ids
+
+        report = mirror.sync(
+            args.base_url, workers=args.workers, refresh=args.refresh
+        )
+        print(
+            f"Синхронизация #{report.run_id}: всего {report.total}, "
+            f"добавлено {len(report.added)}, удалено "
+            f"{len(report.removed)}, не скачано {len(report.failed)} "
+            f"за {report.elapsed_s:.2f} с"
+        )
+        return report
+
+
+if __name__ == "__main__":
+    main()
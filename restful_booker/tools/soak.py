@@ -0,0 +1,393 @@
+"""Длительный прогон CRUD сценария с контролем утечек клиента.
+
+Сценарий тот же, что у tools/load_runner.py. Раз в --sample-interval
+секунд снимаются RSS процесса, объем памяти под tracemalloc и топ мест
+аллокаций, число открытых файловых дескрипторов и сокетов и доля
+переиспользованных соединений пула. Ряд пишется в timeseries.jsonl, а по
+окончании считается прирост каждой метрики на тысячу операций (наклон
+линейной регрессии после прогрева). Прогон завершается с кодом 1, если
+прирост выше порогов.
+
+    python -m restful_booker.tools.soak --duration 7200 --sample-interval 60
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from restful_booker.tools.load_runner import LoadRunner
+from restful_booker.utils.logger import (
+    VERBOSITY_OFF,
+    configure_response_logging,
+    flush_attachments,
+    setup_logging,
+    start_attachments,
+)
+from restful_booker.utils.settings import get_settings
+
+# Запросов в одном CRUD сценарии LoadRunner
+REQUESTS_PER_SCENARIO = 6
+TOP_ALLOCATIONS = 10
+TOP_ALLOCATIONS_PER_SAMPLE = 3
+# Пороги прироста на тысячу операций
+DEFAULT_MAX_RSS_GROWTH_KB = 256.0
+DEFAULT_MAX_TRACED_GROWTH_KB = 128.0
+DEFAULT_MAX_FD_GROWTH = 0.5
+# Доля начальных замеров, которая не учитывается в приросте, и сколько
+# операций должно пройти после прогрева, чтобы прирост считался: на
+# коротких прогонах RSS растет за счет прогрева кэшей и импорта модулей
+WARMUP_FRACTION = 0.2
+MIN_OPERATIONS = 5000
+
+
+def rss_kb():
+    """Текущий RSS из /proc, без него - пиковый из getrusage"""
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def open_descriptors():
+    """Пара (все дескрипторы, сокеты), None без /proc"""
+    try:
+        names = os.listdir("/proc/self/fd")
+    except OSError:
+        return None, None
+    sockets = 0
+    for name in names:
+        try:
+            if os.readlink(f"/proc/self/fd/{name}").startswith("socket:"):
+                sockets += 1
+        except OSError:
+            continue
+    return len(names), sockets
+
+
+def pool_usage(session):
+    """Пара (запросы, новые соединения) по всем пулам адаптеров сессии"""
+    requests_count = connections = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests_count += pool.num_requests
+                connections += pool.num_connections
+    return requests_count, connections
+
+
+def _join_all(threads, finished):
+    for thread in threads:
+        thread.join()
+    finished.set()
+
+
+def growth_per_thousand(samples, metric):
+    """Наклон метрики по числу операций (МНК) на 1000 операций после
+    прогрева, None - если точек меньше трех или операций после прогрева
+    меньше MIN_OPERATIONS"""
+    points = [
+        (sample["operations"], sample[metric])
+        for sample in samples[int(len(samples) * WARMUP_FRACTION) :]
+        if sample.get(metric) is not None
+    ]
+    if len(points) < 3 or points[-1][0] - points[0][0] < MIN_OPERATIONS:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    return covariance / variance * 1000
+
+
+class SoakRunner(LoadRunner):
+    """CRUD сценарий LoadRunner на долгое время с замерами ресурсов.
+
+    attachments=True имитирует тестовый прогон: вокруг каждого сценария
+    копятся и сбрасываются вложения Allure, как в хуках conftest. Буфер
+    вложений в utils/logger.py общий на процесс (в pytest на процесс
+    приходится один тест), поэтому attachments требует concurrency=1.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        duration_s=3600.0,
+        concurrency=4,
+        sample_interval_s=30.0,
+        attachments=False,
+        timeseries_path=None,
+        **kwargs,
+    ):
+        if attachments and concurrency > 1:
+            raise ValueError(
+                "attachments требует concurrency=1: буфер вложений общий "
+                f"на процесс, получено concurrency={concurrency}"
+            )
+        super().__init__(
+            base_url, duration_s=duration_s, concurrency=concurrency, **kwargs
+        )
+        self.sample_interval_s = sample_interval_s
+        self.attachments = attachments
+        self.timeseries_path = timeseries_path
+        self.samples = []
+        self.top_allocations = []
+        self._started = 0.0
+        self._baseline = None
+
+    def run(self):
+        tracemalloc.start()
+        self._baseline = tracemalloc.take_snapshot()
+        self.token.get_token()
+        self._started = time.monotonic()
+        stop_at = self._started + self.duration_s
+        workers = [
+            threading.Thread(target=self._worker, args=(stop_at,))
+            for _ in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        finished = threading.Event()
+        threading.Thread(
+            target=_join_all, args=(workers, finished), daemon=True
+        ).start()
+
+        timeseries = (
+            open(self.timeseries_path, "w") if self.timeseries_path else None
+        )
+        try:
+            self._write_sample(timeseries)
+            while not finished.wait(
+                max(self._next_sample_at() - time.monotonic(), 0)
+            ):
+                self._write_sample(timeseries)
+            self._write_sample(timeseries)
+        finally:
+            if timeseries is not None:
+                timeseries.close()
+
+        self.top_allocations = self._top_allocations()
+        tracemalloc.stop()
+        elapsed = time.monotonic() - self._started
+        self.client.close()
+        return self.summary(elapsed)
+
+    def _run_scenario(self):
+        if not self.attachments:
+            return super()._run_scenario()
+        start_attachments()
+        ok = super()._run_scenario()
+        flush_attachments(failed=not ok, finished=True)
+        return ok
+
+    def _next_sample_at(self):
+        return self._started + len(self.samples) * self.sample_interval_s
+
+    def _write_sample(self, timeseries):
+        sample = self.sample()
+        self.samples.append(sample)
+        if timeseries is not None:
+            timeseries.write(json.dumps(sample) + "\n")
+            timeseries.flush()
+
+    def sample(self):
+        traced_bytes, _ = tracemalloc.get_traced_memory()
+        descriptors, sockets = open_descriptors()
+        pool_requests, pool_connections = pool_usage(self.client.session)
+        with self._stats_lock:
+            scenarios = self.scenarios
+        return {
+            "elapsed_s": round(time.monotonic() - self._started, 3),
+            "operations": scenarios * REQUESTS_PER_SCENARIO,
+            "rss_kb": rss_kb(),
+            "traced_kb": traced_bytes / 1024,
+            "open_fds": descriptors,
+            "sockets": sockets,
+            "pool_requests": pool_requests,
+            "pool_connections": pool_connections,
+            "pool_reuse_ratio": (
+                1 - pool_connections / pool_requests if pool_requests else 0.0
+            ),
+            "top_allocations": self._top_allocations(
+                TOP_ALLOCATIONS_PER_SAMPLE
+            ),
+        }
+
+    def _top_allocations(self, limit=TOP_ALLOCATIONS):
+        """Места с наибольшим приростом памяти с начала прогона"""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        return [
+            {
+                "location": str(stat.traceback),
+                "size_diff_kb": stat.size_diff / 1024,
+                "count_diff": stat.count_diff,
+            }
+            for stat in snapshot.compare_to(self._baseline, "lineno")[:limit]
+        ]
+
+    def leak_report(self, max_rss_kb, max_traced_kb, max_fds):
+        """Прирост на 1000 операций и превышенные пороги"""
+        growth = {
+            "rss_kb": growth_per_thousand(self.samples, "rss_kb"),
+            "traced_kb": growth_per_thousand(self.samples, "traced_kb"),
+            "open_fds": growth_per_thousand(self.samples, "open_fds"),
+            "sockets": growth_per_thousand(self.samples, "sockets"),
+        }
+        limits = {
+            "rss_kb": max_rss_kb,
+            "traced_kb": max_traced_kb,
+            "open_fds": max_fds,
+            "sockets": max_fds,
+        }
+        exceeded = {
+            metric: value
+            for metric, value in growth.items()
+            if value is not None and value > limits[metric]
+        }
+        return {
+            "growth_per_1000_ops": growth,
+            "limits": limits,
+            "exceeded": exceeded,
+        }
+
+
+def start_stand_in():
+    """Локальная замена сервиса отдельным процессом.
+
+    Память и дескрипторы сервера не попадают в замеры прогона. Возвращает
+    процесс и адрес, на котором он слушает.
+    """
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-u",
+            "-m",
+            "restful_booker.utils.booker_server",
+            "--port",
+            "0",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = process.stdout.readline()
+    if not line:
+        process.wait()
+        raise RuntimeError(
+            f"Локальная замена сервиса не запустилась: {process.returncode}"
+        )
+    return process, line.rsplit(" ", 1)[-1].strip()
+
+
+def main(argv=None):
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--base-url",
+        default=settings.base_url,
+        help="По умолчанию BASE_URL, без него - локальная замена сервиса "
+        "отдельным процессом",
+    )
+    parser.add_argument("--duration", type=float, default=3600.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rps", type=float, default=None)
+    parser.add_argument("--sample-interval", type=float, default=30.0)
+    parser.add_argument(
+        "--attachments",
+        action="store_true",
+        help="Копить и сбрасывать вложения Allure вокруг каждого "
+        "сценария, только с --concurrency 1",
+    )
+    parser.add_argument(
+        "--log-file",
+        default=None,
+        help="Писать лог запросов в файл через setup_logging",
+    )
+    parser.add_argument(
+        "--max-rss-growth-kb", type=float, default=DEFAULT_MAX_RSS_GROWTH_KB
+    )
+    parser.add_argument(
+        "--max-traced-growth-kb",
+        type=float,
+        default=DEFAULT_MAX_TRACED_GROWTH_KB,
+    )
+    parser.add_argument(
+        "--max-fd-growth", type=float, default=DEFAULT_MAX_FD_GROWTH
+    )
+    parser.add_argument("--output", default="soak-results")
+    args = parser.parse_args(argv)
+    if args.attachments and args.concurrency > 1:
+        parser.error("--attachments работает только с --concurrency 1")
+
+    if args.log_file:
+        setup_logging(log_file=args.log_file, console=False)
+    configure_response_logging(
+        verbosity=None if args.log_file else VERBOSITY_OFF, settings=settings
+    )
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stand_in = None
+    base_url = args.base_url
+    if not base_url:
+        stand_in, base_url = start_stand_in()
+    try:
+        runner = SoakRunner(
+            base_url,
+            duration_s=args.duration,
+            concurrency=args.concurrency,
+            rps=args.rps,
+            sample_interval_s=args.sample_interval,
+            attachments=args.attachments,
+            timeseries_path=output_dir / "timeseries.jsonl",
+            user_name=settings.user_name,
+            password=settings.password,
+        )
+        summary = runner.run()
+    finally:
+        if stand_in is not None:
+            stand_in.terminate()
+            stand_in.wait()
+            stand_in.stdout.close()
+
+    summary["leaks"] = runner.leak_report(
+        args.max_rss_growth_kb, args.max_traced_growth_kb, args.max_fd_growth
+    )
+    summary["top_allocations"] = runner.top_allocations
+    summary["last_sample"] = runner.samples[-1]
+    with open(output_dir / "summary.json", "w") as file:
+        json.dump(summary, file, indent=4, ensure_ascii=False)
+
+    print(
+        f"{summary['scenarios']} сценариев, "
+        f"{summary['last_sample']['operations']} операций, "
+        f"переиспользование соединений "
+        f"{summary['last_sample']['pool_reuse_ratio']:.1%}"
+    )
+    for metric, value in summary["leaks"]["growth_per_1000_ops"].items():
+        shown = "n/a" if value is None else f"{value:.2f}"
+        print(f"{metric:<10} прирост на 1000 операций: {shown}")
+    if summary["leaks"]["exceeded"]:
+        print(f"Превышены пороги: {summary['leaks']['exceeded']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
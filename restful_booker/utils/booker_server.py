@@ -0,0 +1,526 @@
+"""Локальная замена Restful Booker для герметичного запуска тестов.
+
+Реализует тот же контракт /auth, /booking, /booking/{id} (GET, POST,
+PUT, PATCH, DELETE) и валидирует тела запросов моделями из
+models/booking.py. Бронирования хранятся в памяти со вторичными
+индексами по firstname, lastname, checkin и checkout.
+
+Запуск отдельным процессом:
+    python -m restful_booker.utils.booker_server --port 3001
+"""
+
+import argparse
+import base64
+import bisect
+import hashlib
+import json
+import logging
+import secrets
+import threading
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from pydantic import ValidationError
+
+from restful_booker.models.booking import AuthCredentials, Booking
+from restful_booker.utils.settings import DEFAULT_PASSWORD, DEFAULT_USER_NAME
+
+logger = logging.getLogger(__name__)
+
+# Как часто serve_forever проверяет запрос на остановку: от этого зависит,
+# сколько ждет stop() в конце каждой тестовой сессии
+SHUTDOWN_POLL_INTERVAL = 0.05
+
+DEFAULT_SEED = [
+    {
+        "firstname": "Josh",
+        "lastname": "Allen",
+        "totalprice": 111,
+        "depositpaid": True,
+        "bookingdates": {"checkin": "2023-06-10", "checkout": "2023-06-20"},
+        "additionalneeds": "Breakfast",
+    },
+    {
+        "firstname": "John",
+        "lastname": "Smith",
+        "totalprice": 250,
+        "depositpaid": False,
+        "bookingdates": {"checkin": "2024-12-30", "checkout": "2025-01-10"},
+        "additionalneeds": "Lunch",
+    },
+    {
+        "firstname": "Jim",
+        "lastname": "Brown",
+        "totalprice": 480,
+        "depositpaid": True,
+        "bookingdates": {"checkin": "2025-03-01", "checkout": "2025-03-15"},
+        "additionalneeds": "Dinner",
+    },
+    {
+        "firstname": "Mary",
+        "lastname": "Jones",
+        "totalprice": 95,
+        "depositpaid": False,
+        "bookingdates": {"checkin": "2018-01-01", "checkout": "2019-01-01"},
+        "additionalneeds": "Breakfast",
+    },
+]
+
+
+class BookingStore:
+    """Потокобезопасное хранилище бронирований с индексами.
+
+    Имена индексируются словарем имя -> множество ID, даты - отсортированными
+    списками пар (дата, ID), поэтому фильтр по дате "не раньше чем" - это
+    bisect и срез, а не полный перебор.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._bookings = {}
+        self._next_id = 1
+        self._by_firstname = {}
+        self._by_lastname = {}
+        self._by_checkin = []
+        self._by_checkout = []
+
+    def __len__(self):
+        return len(self._bookings)
+
+    def get(self, booking_id):
+        with self._lock:
+            return self._bookings.get(booking_id)
+
+    def add(self, booking):
+        with self._lock:
+            booking_id = self._next_id
+            self._next_id += 1
+            self._insert(booking_id, booking)
+            return booking_id
+
+    def replace(self, booking_id, booking):
+        """Замена бронирования, False если его уже нет"""
+        with self._lock:
+            if not self._remove(booking_id):
+                return False
+            self._insert(booking_id, booking)
+            return True
+
+    def delete(self, booking_id):
+        """Удаление бронирования, False если его уже нет"""
+        with self._lock:
+            return self._remove(booking_id)
+
+    def filter(
+        self, firstname=None, lastname=None, checkin=None, checkout=None
+    ):
+        """ID бронирований, подходящих под все переданные условия.
+
+        firstname и lastname сравниваются точно, checkin и checkout -
+        "больше или равно", как в документации Restful Booker.
+        """
+        with self._lock:
+            candidates = []
+            if firstname is not None:
+                candidates.append(self._by_firstname.get(firstname, set()))
+            if lastname is not None:
+                candidates.append(self._by_lastname.get(lastname, set()))
+            if checkin is not None:
+                candidates.append(_ids_from(self._by_checkin, checkin))
+            if checkout is not None:
+                candidates.append(_ids_from(self._by_checkout, checkout))
+            if not candidates:
+                return list(self._bookings)
+            candidates.sort(key=len)
+            result = set(candidates[0]).intersection(*candidates[1:])
+            return sorted(result)
+
+    def _insert(self, booking_id, booking):
+        self._bookings[booking_id] = booking
+        dates = booking["bookingdates"]
+        self._by_firstname.setdefault(booking["firstname"], set()).add(
+            booking_id
+        )
+        self._by_lastname.setdefault(booking["lastname"], set()).add(
+            booking_id
+        )
+        bisect.insort(self._by_checkin, (dates["checkin"], booking_id))
+        bisect.insort(self._by_checkout, (dates["checkout"], booking_id))
+
+    def _remove(self, booking_id):
+        booking = self._bookings.pop(booking_id, None)
+        if booking is None:
+            return False
+        dates = booking["bookingdates"]
+        _discard(self._by_firstname, booking["firstname"], booking_id)
+        _discard(self._by_lastname, booking["lastname"], booking_id)
+        _remove_sorted(self._by_checkin, (dates["checkin"], booking_id))
+        _remove_sorted(self._by_checkout, (dates["checkout"], booking_id))
+        return True
+
+
+def _ids_from(index, value):
+    start = bisect.bisect_left(index, (value,))
+    return {booking_id for _, booking_id in index[start:]}
+
+
+def _discard(index, key, booking_id):
+    ids = index[key]
+    ids.discard(booking_id)
+    if not ids:
+        del index[key]
+
+
+def _remove_sorted(index, item):
+    position = bisect.bisect_left(index, item)
+    del index[position]
+
+
+class BookerRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "BookerStandIn/1.0"
+
+    def do_GET(self):
+        if self._inject_fault():
+            return
+        path, query = self._parse_path()
+        if path == "/booking":
+            self._get_booking_ids(query)
+        elif path == "/ping":
+            self._send_text(HTTPStatus.CREATED, "Created")
+        elif (booking_id := self._booking_id(path)) is not None:
+            booking = self.server.store.get(booking_id)
+            if booking is None:
+                self._send_text(HTTPStatus.NOT_FOUND, "Not Found")
+            else:
+                self._send_json_conditional(booking)
+        else:
+            self._send_text(HTTPStatus.NOT_FOUND, "Not Found")
+
+    def do_POST(self):
+        if self._inject_fault():
+            return
+        path, _ = self._parse_path()
+        if path == "/auth":
+            self._create_token()
+        elif path == "/booking":
+            booking = self._read_booking()
+            if booking is not None:
+                booking_id = self.server.store.add(booking)
+                self._send_json(
+                    HTTPStatus.OK,
+                    {"bookingid": booking_id, "booking": booking},
+                )
+        else:
+            self._send_text(HTTPStatus.NOT_FOUND, "Not Found")
+
+    def do_PUT(self):
+        if self._inject_fault():
+            return
+        booking_id = self._authorized_booking_id()
+        if booking_id is None:
+            return
+        booking = self._read_booking()
+        if booking is not None:
+            self._send_replaced(booking_id, booking)
+
+    def do_PATCH(self):
+        if self._inject_fault():
+            return
+        booking_id = self._authorized_booking_id()
+        if booking_id is None:
+            return
+        changes = self._read_json()
+        if changes is None:
+            return
+        current = self.server.store.get(booking_id)
+        if current is None:
+            self._send_not_allowed()
+            return
+        merged = dict(current)
+        if isinstance(changes.get("bookingdates"), dict):
+            changes["bookingdates"] = {
+                **merged["bookingdates"],
+                **changes["bookingdates"],
+            }
+        merged.update(changes)
+        booking = self._validate_booking(merged)
+        if booking is not None:
+            self._send_replaced(booking_id, booking)
+
+    def do_DELETE(self):
+        if self._inject_fault():
+            return
+        booking_id = self._authorized_booking_id()
+        if booking_id is None:
+            return
+        if self.server.store.delete(booking_id):
+            self._send_text(HTTPStatus.CREATED, "Created")
+        else:
+            self._send_not_allowed()
+
+    def _inject_fault(self):
+        """Ответ ошибкой из очереди BookerServer.fail_next, если она есть"""
+        fault = self.server.next_fault()
+        if fault is None:
+            return False
+        status, retry_after = fault
+        headers = {} if retry_after is None else {"Retry-After": retry_after}
+        self._discard_body()
+        self._send(
+            status,
+            status.phrase.encode(),
+            "text/plain; charset=utf-8",
+            headers,
+        )
+        return True
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def _parse_path(self):
+        parts = urlsplit(self.path)
+        query = {
+            key: values[0] for key, values in parse_qs(parts.query).items()
+        }
+        return parts.path.rstrip("/") or "/", query
+
+    def _booking_id(self, path):
+        prefix, _, raw_id = path.rpartition("/")
+        if prefix != "/booking" or not raw_id.isdigit():
+            return None
+        return int(raw_id)
+
+    def _get_booking_ids(self, query):
+        ids = self.server.store.filter(
+            firstname=query.get("firstname"),
+            lastname=query.get("lastname"),
+            checkin=query.get("checkin"),
+            checkout=query.get("checkout"),
+        )
+        self._send_json(
+            HTTPStatus.OK, [{"bookingid": booking_id} for booking_id in ids]
+        )
+
+    def _create_token(self):
+        body = self._read_json()
+        if body is None:
+            return
+        try:
+            credentials = AuthCredentials.model_validate(body)
+        except ValidationError:
+            self._send_json(HTTPStatus.OK, {"reason": "Bad credentials"})
+            return
+        if (credentials.username, credentials.password) != (
+            self.server.user_name,
+            self.server.password,
+        ):
+            self._send_json(HTTPStatus.OK, {"reason": "Bad credentials"})
+            return
+        token = secrets.token_hex(8)[:15]
+        with self.server.tokens_lock:
+            self.server.tokens.add(token)
+        self._send_json(HTTPStatus.OK, {"token": token})
+
+    def _authorized_booking_id(self):
+        """ID из пути для изменяющих запросов или None с уже отправленным
+        ответом об ошибке"""
+        path, _ = self._parse_path()
+        booking_id = self._booking_id(path)
+        if booking_id is None:
+            self._discard_body()
+            self._send_text(HTTPStatus.NOT_FOUND, "Not Found")
+            return None
+        if not self._is_authorized():
+            self._discard_body()
+            self._send_text(HTTPStatus.FORBIDDEN, "Forbidden")
+            return None
+        if self.server.store.get(booking_id) is None:
+            self._discard_body()
+            self._send_not_allowed()
+            return None
+        return booking_id
+
+    def _send_replaced(self, booking_id, booking):
+        if self.server.store.replace(booking_id, booking):
+            self._send_json(HTTPStatus.OK, booking)
+        else:
+            self._send_not_allowed()
+
+    def _send_not_allowed(self):
+        self._send_text(HTTPStatus.METHOD_NOT_ALLOWED, "Method Not Allowed")
+
+    def _is_authorized(self):
+        cookies = self.headers.get("Cookie", "")
+        for cookie in cookies.split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == "token":
+                with self.server.tokens_lock:
+                    if value in self.server.tokens:
+                        return True
+        authorization = self.headers.get("Authorization", "")
+        if authorization.startswith("Basic "):
+            expected = base64.b64encode(
+                f"{self.server.user_name}:{self.server.password}".encode()
+            ).decode()
+            return authorization[len("Basic ") :] == expected
+        return False
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _discard_body(self):
+        self._read_body()
+
+    def _read_json(self):
+        try:
+            body = json.loads(self._read_body() or b"null")
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            self._send_text(HTTPStatus.BAD_REQUEST, "Bad Request")
+            return None
+        return body
+
+    def _read_booking(self):
+        body = self._read_json()
+        if body is None:
+            return None
+        return self._validate_booking(body)
+
+    def _validate_booking(self, body):
+        try:
+            return Booking.model_validate(body).model_dump()
+        except ValidationError as error:
+            self._send_text(HTTPStatus.BAD_REQUEST, str(error))
+            return None
+
+    def _send_json(self, status, payload):
+        self._send(
+            status,
+            json.dumps(payload).encode(),
+            "application/json; charset=utf-8",
+        )
+
+    def _send_json_conditional(self, payload):
+        """200 с ETag от тела или 304 без тела, если ETag совпал с
+        If-None-Match, как делает Express у Restful Booker"""
+        body = json.dumps(payload).encode()
+        etag = f'W/"{len(body):x}-{hashlib.sha1(body).hexdigest()[:27]}"'
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self._send(
+            HTTPStatus.OK,
+            body,
+            "application/json; charset=utf-8",
+            headers={"ETag": etag},
+        )
+
+    def _send_text(self, status, text):
+        self._send(status, text.encode(), "text/plain; charset=utf-8")
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class BookerServer(ThreadingHTTPServer):
+    """HTTP сервер-заглушка, по умолчанию на свободном порту localhost"""
+
+    daemon_threads = True
+    # Очередь подключений по умолчанию - 5, при всплеске новых соединений
+    # от параллельных клиентов лишние сбрасываются
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        seed=DEFAULT_SEED,
+        user_name=DEFAULT_USER_NAME,
+        password=DEFAULT_PASSWORD,
+    ):
+        super().__init__((host, port), BookerRequestHandler)
+        self.user_name = user_name
+        self.password = password
+        self.tokens = set()
+        self.tokens_lock = threading.Lock()
+        self.store = BookingStore()
+        for booking in seed:
+            self.store.add(Booking.model_validate(booking).model_dump())
+        self._faults = deque()
+        self._faults_lock = threading.Lock()
+        self._thread = None
+
+    def fail_next(
+        self, count=1, status=HTTPStatus.SERVICE_UNAVAILABLE, retry_after=None
+    ):
+        """Следующие count запросов получат ответ status (с заголовком
+        Retry-After, если он задан) - для проверки повторов и размыкателя
+        на стороне клиента"""
+        fault = (HTTPStatus(status), retry_after)
+        with self._faults_lock:
+            self._faults.extend([fault] * count)
+
+    def next_fault(self):
+        with self._faults_lock:
+            return self._faults.popleft() if self._faults else None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.serve_forever,
+            kwargs={"poll_interval": SHUTDOWN_POLL_INTERVAL},
+            name="booker-server",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    args = parser.parse_args()
+
+    server = BookerServer(host=args.host, port=args.port)
+    print(f"Restful Booker stand-in: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
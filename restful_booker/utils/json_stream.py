@@ -0,0 +1,103 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+# Конец числа или литерала (true, false, null) внутри массива
+_SCALAR_END = _WHITESPACE + ",]"
+
+# Что ожидается дальше в массиве
+_EXPECT_START = "start"  # открывающая [
+_EXPECT_FIRST = "first"  # первый элемент или ] пустого массива
+_EXPECT_VALUE = "value"  # элемент после запятой
+_EXPECT_DELIMITER = "delimiter"  # запятая или ] после элемента
+_DONE = "done"
+
+
+def iter_json_array(chunks):
+    """Элементы JSON массива верхнего уровня по мере поступления байтов.
+
+    chunks - итератор кусков bytes (например, response.iter_content).
+    Каждый элемент разбирается json.JSONDecoder.raw_decode, как только
+    он целиком пришел, поэтому в памяти держится только недочитанный
+    хвост, а не весь ответ. Число или литерал на конце куска ждет
+    следующего куска: "1" может оказаться началом "1.5". Нарушение
+    грамматики (пропущенная или лишняя запятая, данные после ]) - это
+    ValueError.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    state = _EXPECT_START
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        items, position, state = _parse(decoder, buffer, state, final=False)
+        yield from items
+        buffer = buffer[position:]
+
+    buffer += text_decoder.decode(b"", final=True)
+    items, _, state = _parse(decoder, buffer, state, final=True)
+    yield from items
+    if state != _DONE:
+        raise ValueError("JSON массив оборван или некорректен")
+
+
+def _parse(decoder, buffer, state, final):
+    """Разбор буфера с позиции 0 в состоянии state: (элементы, позиция,
+    с которой продолжить, новое состояние)"""
+    items = []
+    position = 0
+    length = len(buffer)
+    while True:
+        while position < length and buffer[position] in _WHITESPACE:
+            position += 1
+        if position == length:
+            return items, position, state
+        char = buffer[position]
+        if state == _DONE:
+            raise ValueError("Данные после конца JSON массива")
+        if state == _EXPECT_START:
+            if char != "[":
+                raise ValueError("Ожидался JSON массив")
+            state = _EXPECT_FIRST
+            position += 1
+            continue
+        if state == _EXPECT_DELIMITER:
+            if char == ",":
+                state = _EXPECT_VALUE
+            elif char == "]":
+                state = _DONE
+            else:
+                raise ValueError(
+                    f"Ожидалась запятая или ] на позиции {position}"
+                )
+            position += 1
+            continue
+        if char == "]" and state == _EXPECT_FIRST:
+            state = _DONE
+            position += 1
+            continue
+        if char in ",]":
+            raise ValueError(f"Ожидался элемент массива на позиции {position}")
+
+        if char in '{["':
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                # Элемент еще не пришел целиком
+                return items, position, state
+        else:
+            token_end = position
+            while token_end < length and buffer[token_end] not in _SCALAR_END:
+                token_end += 1
+            if token_end == length and not final:
+                return items, position, state
+            item, end = decoder.raw_decode(buffer, position)
+            if end != token_end:
+                raise ValueError(
+                    f"Некорректное значение {buffer[position:token_end]!r}"
+                )
+        items.append(item)
+        state = _EXPECT_DELIMITER
+        position = end
@@ -0,0 +1,280 @@
+import atexit
+import json
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from urllib.parse import urlsplit
+
+from requests import Response
+
+from restful_booker.utils.settings import (
+    DEFAULT_ALLURE_ATTACH,
+    DEFAULT_ALLURE_ATTACH_SAMPLE_RATE,
+    DEFAULT_LOG_MAX_BODY_SIZE,
+    DEFAULT_LOG_VERBOSITY,
+)
+
+logger = logging.getLogger(__name__)
+
+VERBOSITY_OFF = "off"
+VERBOSITY_COMPACT = "compact"
+
+# Значения по умолчанию до configure_response_logging, окружение
+# читается только через utils.settings
+_verbosity = DEFAULT_LOG_VERBOSITY
+_max_body_size = DEFAULT_LOG_MAX_BODY_SIZE
+
+ATTACH_OFF = "off"
+ATTACH_SAMPLED = "sampled"
+
+_attach_mode = DEFAULT_ALLURE_ATTACH
+_attach_sample_rate = DEFAULT_ALLURE_ATTACH_SAMPLE_RATE
+_attach_active = False
+_attach_sampled = False
+_pending_attachments = []
+
+_listener = None
+_queue_handler = None
+
+
+def setup_logging(
+    level=logging.INFO, log_file="test_execution.log", console=True
+):
+    """Настройка базового логирования.
+
+    Запись в файл и консоль выполняет QueueListener в отдельном потоке,
+    поток запроса только кладет запись в очередь. Повторный вызов
+    останавливает прежний QueueListener и закрывает его обработчики.
+    """
+    global _listener, _queue_handler
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        root.removeHandler(_queue_handler)
+
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    handlers = [logging.FileHandler(log_file)]
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    if _listener is None:
+        atexit.register(_stop_listener)
+
+    _listener = listener
+    _queue_handler = QueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    return listener
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def configure_response_logging(
+    verbosity=None, max_body_size=None, settings=None
+):
+    """Режим логирования ответов.
+
+    verbosity: "compact" - одна строка на INFO (метод, путь, статус, время,
+    размер), тела и заголовки только на DEBUG; "off" - без логирования,
+    для массовых прогонов. max_body_size - обрезка тел в DEBUG записях.
+    settings (utils.settings.Settings) применяет режимы из окружения:
+    LOG_VERBOSITY, LOG_MAX_BODY_SIZE, а для вложений - ALLURE_ATTACH и
+    ALLURE_ATTACH_SAMPLE_RATE. Явно переданные значения важнее.
+    """
+    global _verbosity, _max_body_size
+    if settings is not None:
+        configure_response_attaching(
+            settings.allure_attach, settings.allure_attach_sample_rate
+        )
+        if verbosity is None:
+            verbosity = settings.log_verbosity
+        if max_body_size is None:
+            max_body_size = settings.log_max_body_size
+    if verbosity is not None:
+        _verbosity = verbosity
+    if max_body_size is not None:
+        _max_body_size = max_body_size
+
+
+def _truncate(body):
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    else:
+        body = str(body)
+    if len(body) <= _max_body_size:
+        return body
+    return f"{body[:_max_body_size]}... ({len(body)} символов)"
+
+
+def response_logging(response: Response):
+    """Логирование ответа API в консоль и файл"""
+    if _verbosity == VERBOSITY_OFF or not logger.isEnabledFor(logging.INFO):
+        return
+    request = response.request
+    logger.info(
+        "%s %s %s %.1fms %dB",
+        request.method,
+        urlsplit(request.url).path,
+        response.status_code,
+        response.elapsed.total_seconds() * 1000,
+        _body_size(response),
+    )
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug("Request: %s %s", request.method, request.url)
+    if request.body:
+        logger.debug("Request body: %s", _truncate(request.body))
+    logger.debug("Request headers: %s", request.headers)
+    if _is_read(response):
+        logger.debug("Response: %s", _truncate(response.content))
+
+
+def _is_read(response):
+    """False для потокового ответа (stream=True), тело которого еще не
+    прочитано: обращение к content скачало бы его целиком"""
+    return getattr(response, "_content_consumed", True)
+
+
+def _body_size(response):
+    if _is_read(response):
+        return len(response.content)
+    return int(response.headers.get("Content-Length", 0))
+
+
+def configure_response_attaching(mode=None, sample_rate=None):
+    """Политика прикрепления запросов/ответов к Allure.
+
+    mode: "sampled" - вложения копятся в течение теста и сериализуются
+    только если тест упал или попал в выборку с долей sample_rate;
+    "off" - без вложений, для массовых и нагрузочных прогонов.
+    """
+    global _attach_mode, _attach_sample_rate
+    if mode is not None:
+        _attach_mode = mode
+    if sample_rate is not None:
+        _attach_sample_rate = sample_rate
+
+
+def start_attachments():
+    """Начало теста: включение буфера и решение о выборке"""
+    global _attach_active, _attach_sampled
+    _pending_attachments.clear()
+    _attach_active = _attach_mode != ATTACH_OFF
+    _attach_sampled = random.random() < _attach_sample_rate
+
+
+def flush_attachments(failed=False, finished=False):
+    """Прикрепление накопленных ответов, если тест упал или в выборке.
+
+    finished=True завершает тест: буфер выключается до следующего
+    start_attachments, ответы вне тестов не накапливаются.
+    """
+    global _attach_active
+    pending = list(_pending_attachments)
+    _pending_attachments.clear()
+    if finished:
+        _attach_active = False
+    if failed or _attach_sampled:
+        for response in pending:
+            _attach_response(response)
+
+
+def response_attaching(response: Response):
+    """Прикрепление информации о запросе/ответе в Allure.
+
+    Ответ только запоминается, сериализация откладывается до
+    flush_attachments, когда известен результат теста.
+    """
+    if _attach_active:
+        _pending_attachments.append(response)
+
+
+def _attach_response(response: Response):
+    # allure импортируется только когда действительно нужно вложение:
+    # инструментам и бенчмаркам он не нужен вовсе
+    import allure
+    from allure_commons.types import AttachmentType
+
+    allure.attach(
+        body=response.request.url,
+        name="Request url",
+        attachment_type=AttachmentType.TEXT,
+    )
+
+    if response.request.body:
+        try:
+            if isinstance(response.request.body, dict):
+                body_data = response.request.body
+            else:
+                body_data = json.loads(response.request.body)
+
+            allure.attach(
+                body=json.dumps(body_data, indent=4, ensure_ascii=True),
+                name="Request body",
+                attachment_type=AttachmentType.JSON,
+                extension="json",
+            )
+        except Exception:
+            allure.attach(
+                body=str(response.request.body),
+                name="Request body",
+                attachment_type=AttachmentType.TEXT,
+            )
+
+    try:
+        allure.attach(
+            body=json.dumps(response.json(), indent=4, ensure_ascii=True),
+            name="Response",
+            attachment_type=AttachmentType.JSON,
+            extension="json",
+        )
+    except Exception:
+        allure.attach(
+            body=response.text,
+            name="Response",
+            attachment_type=AttachmentType.TEXT,
+        )
+
+
+def attach_screenshot(name="screenshot"):
+    """Прикрепление скриншота в Allure"""
+    import allure
+    from allure_commons.types import AttachmentType
+
+    try:
+        from selene import browser
+
+        allure.attach(
+            browser.driver.get_screenshot_as_png(),
+            name=name,
+            attachment_type=AttachmentType.PNG,
+        )
+    except Exception as e:
+        logging.error(f"Не удалось сделать скриншот: {e}")
+
+
+def attach_html(name="page_html"):
+    """Прикрепление HTML страницы в Allure"""
+    import allure
+    from allure_commons.types import AttachmentType
+
+    try:
+        from selene import browser
+
+        html = browser.driver.page_source
+        allure.attach(html, name=name, attachment_type=AttachmentType.HTML)
+    except Exception as e:
+        logging.error(f"Не удалось получить HTML: {e}")
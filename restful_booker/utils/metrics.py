@@ -0,0 +1,278 @@
+import threading
+from urllib.parse import urlsplit
+
+SUB_BUCKET_BITS = 7
+
+
+class LatencyHistogram:
+    """Гистограмма задержек в микросекундах в духе HdrHistogram.
+
+    Значения группируются в лог-линейные корзины: до 2**SUB_BUCKET_BITS
+    мкс точно, дальше с относительной погрешностью не больше
+    1 / 2**SUB_BUCKET_BITS (меньше 1%). Память зависит от диапазона
+    значений, а не от их количества.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.total_count = 0
+        self.max_value = 0
+
+    def record(self, value_us):
+        value = max(int(value_us), 0)
+        shift = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+        bucket = (value >> shift) << shift
+        with self._lock:
+            self._counts[bucket] = self._counts.get(bucket, 0) + 1
+            self.total_count += 1
+            self.max_value = max(self.max_value, value)
+
+    def merge(self, other):
+        with self._lock:
+            for bucket, count in other._counts.items():
+                self._counts[bucket] = self._counts.get(bucket, 0) + count
+            self.total_count += other.total_count
+            self.max_value = max(self.max_value, other.max_value)
+
+    def percentile(self, percent):
+        """Верхняя граница значения для заданного перцентиля (0-100)"""
+        if not self.total_count:
+            return 0
+        threshold = self.total_count * percent / 100
+        seen = 0
+        for bucket, count in sorted(self._counts.items()):
+            seen += count
+            if seen >= threshold:
+                return min(_bucket_upper(bucket), self.max_value)
+        return self.max_value
+
+    def distribution(self):
+        """Список (значение, перцентиль, накопленное количество) по всем
+        непустым корзинам, как в выводе outputPercentileDistribution"""
+        rows = []
+        seen = 0
+        for bucket, count in sorted(self._counts.items()):
+            seen += count
+            rows.append(
+                (
+                    min(_bucket_upper(bucket), self.max_value),
+                    seen / self.total_count,
+                    seen,
+                )
+            )
+        return rows
+
+    def format_distribution(self, unit_divisor=1000.0):
+        """Текстовая таблица распределения, по умолчанию в миллисекундах"""
+        lines = [
+            f"{'Value':>12} {'Percentile':>14} {'TotalCount':>10} "
+            f"{'1/(1-Percentile)':>18}"
+        ]
+        for value, fraction, seen in self.distribution():
+            inverse = "inf" if fraction >= 1 else f"{1 / (1 - fraction):.2f}"
+            lines.append(
+                f"{value / unit_divisor:12.3f} {fraction:14.12f} "
+                f"{seen:10d} {inverse:>18}"
+            )
+        lines.append(
+            f"#[Max = {self.max_value / unit_divisor:.3f}, "
+            f"Total count = {self.total_count}]"
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _bucket_upper(bucket):
+    shift = max(bucket.bit_length() - SUB_BUCKET_BITS, 0)
+    return bucket + (1 << shift) - 1
+
+
+class EndpointStats:
+    """Счетчики и гистограмма задержек одного эндпоинта"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_s, ok=True):
+        self.histogram.record(elapsed_s * 1_000_000)
+        if not ok:
+            with self._lock:
+                self.errors += 1
+
+    def summary(self, duration_s):
+        count = self.histogram.total_count
+        return {
+            "count": count,
+            "errors": self.errors,
+            "error_rate": self.errors / count if count else 0.0,
+            "throughput_rps": count / duration_s if duration_s else 0.0,
+            "p50_ms": self.histogram.percentile(50) / 1000,
+            "p95_ms": self.histogram.percentile(95) / 1000,
+            "p99_ms": self.histogram.percentile(99) / 1000,
+            "max_ms": self.histogram.max_value / 1000,
+        }
+
+
+def endpoint_template(url):
+    """Путь запроса с числовыми сегментами, замененными на {id}:
+    http://host/booking/15?x=1 -> /booking/{id}"""
+    path = urlsplit(url).path or "/"
+    return "/".join(
+        "{id}" if segment.isdigit() else segment for segment in path.split("/")
+    )
+
+
+class RequestStats:
+    """Агрегаты запросов к одному эндпоинту (метод + шаблон пути)"""
+
+    def __init__(self):
+        self.total = LatencyHistogram()
+        self.ttfb = LatencyHistogram()
+        self.total_sum_s = 0.0
+        self.ttfb_sum_s = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.statuses = {}
+
+    def summary(self):
+        count = self.total.total_count
+        return {
+            "count": count,
+            "statuses": dict(sorted(self.statuses.items())),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "total_ms": _percentiles(self.total, self.total_sum_s, count),
+            "ttfb_ms": _percentiles(self.ttfb, self.ttfb_sum_s, count),
+        }
+
+
+def _percentiles(histogram, sum_s, count):
+    return {
+        "mean": sum_s * 1000 / count if count else 0.0,
+        "p50": histogram.percentile(50) / 1000,
+        "p95": histogram.percentile(95) / 1000,
+        "p99": histogram.percentile(99) / 1000,
+        "max": histogram.max_value / 1000,
+    }
+
+
+class RequestMetrics:
+    """Наблюдатель BookerClient: время, размеры и статусы по эндпоинтам.
+
+    ttfb - время до получения заголовков ответа (response.elapsed, включает
+    DNS и подключение, если соединение новое), total - полное время вызова
+    вместе с чтением тела и повторами.
+    """
+
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def on_response(self, method, url, response, total_s):
+        key = (method.upper(), endpoint_template(url))
+        ttfb_s = response.elapsed.total_seconds()
+        request_bytes = len(response.request.body or b"")
+        response_bytes = (
+            len(response.content)
+            if getattr(response, "_content_consumed", True)
+            else int(response.headers.get("Content-Length", 0))
+        )
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = RequestStats()
+            stats.total_sum_s += total_s
+            stats.ttfb_sum_s += ttfb_s
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.statuses[response.status_code] = (
+                stats.statuses.get(response.status_code, 0) + 1
+            )
+        stats.total.record(total_s * 1_000_000)
+        stats.ttfb.record(ttfb_s * 1_000_000)
+
+    def to_dict(self):
+        with self._lock:
+            items = sorted(self.endpoints.items())
+        return {
+            f"{method} {path}": stats.summary()
+            for (method, path), stats in items
+        }
+
+    def to_prometheus(self, prefix="booker"):
+        """Агрегаты в текстовом формате экспозиции Prometheus"""
+        with self._lock:
+            items = sorted(self.endpoints.items())
+        lines = [
+            f"# HELP {prefix}_requests_total Число запросов",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        for (method, path), stats in items:
+            for status, count in sorted(stats.statuses.items()):
+                labels = _labels(method, path, status=status)
+                lines.append(f"{prefix}_requests_total{{{labels}}} {count}")
+        for name, help_text, attribute, sum_attribute in (
+            (
+                "request_duration_seconds",
+                "Полное время запроса",
+                "total",
+                "total_sum_s",
+            ),
+            (
+                "time_to_first_byte_seconds",
+                "Время до заголовков ответа",
+                "ttfb",
+                "ttfb_sum_s",
+            ),
+        ):
+            metric = f"{prefix}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for (method, path), stats in items:
+                histogram = getattr(stats, attribute)
+                for quantile in (0.5, 0.95, 0.99):
+                    labels = _labels(method, path, quantile=quantile)
+                    value = histogram.percentile(quantile * 100) / 1_000_000
+                    lines.append(f"{metric}{{{labels}}} {value:.6f}")
+                labels = _labels(method, path)
+                total_sum = getattr(stats, sum_attribute)
+                lines.append(f"{metric}_sum{{{labels}}} {total_sum:.6f}")
+                lines.append(
+                    f"{metric}_count{{{labels}}} {histogram.total_count}"
+                )
+        for name, attribute in (
+            ("request_bytes_total", "request_bytes"),
+            ("response_bytes_total", "response_bytes"),
+        ):
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            for (method, path), stats in items:
+                labels = _labels(method, path)
+                lines.append(
+                    f"{metric}{{{labels}}} {getattr(stats, attribute)}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def format_table(self):
+        """Сводная таблица для отчета"""
+        lines = [
+            f"{'endpoint':<28} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'ttfb p50':>9} {'resp KB':>8}"
+        ]
+        for name, row in self.to_dict().items():
+            lines.append(
+                f"{name:<28} {row['count']:>6} "
+                f"{row['total_ms']['p50']:>8.2f} "
+                f"{row['total_ms']['p95']:>8.2f} "
+                f"{row['total_ms']['p99']:>8.2f} "
+                f"{row['ttfb_ms']['p50']:>9.2f} "
+                f"{row['response_bytes'] / 1024:>8.1f}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method, path, **extra):
+    labels = {"method": method, "endpoint": path, **extra}
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
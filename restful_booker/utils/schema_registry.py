@@ -0,0 +1,71 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from restful_booker.models.booking import Booking, BookingResponse
+
+SCHEMAS_DIR = Path(__file__).resolve().parent.parent / "schemas"
+
+# Модели тех же данных, что описывают схемы. Проверку схемой заменяет
+# только модель, которая не слабее схемы (см. covers_schema)
+SCHEMA_MODELS = {
+    "get_one_booking": Booking,
+    "post_booking": BookingResponse,
+}
+
+
+@lru_cache(maxsize=None)
+def get_validator(name):
+    """Скомпилированный валидатор схемы schemas/<name>.json.
+
+    Схема читается с диска и проверяется один раз за процесс, путь не
+    зависит от текущей директории.
+    """
+    from jsonschema.validators import validator_for
+
+    name = name.removesuffix(".json")
+    with open(SCHEMAS_DIR / f"{name}.json") as file:
+        schema = json.load(file)
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+@lru_cache(maxsize=None)
+def covers_schema(model_type):
+    """True, если модель не пропустит ничего, что отвергнет схема: строгий
+    режим без приведения типов ("111" -> 111) и запрет лишних ключей во
+    всех вложенных моделях"""
+    config = model_type.model_config
+    if not config.get("strict") or config.get("extra") != "forbid":
+        return False
+    for field in model_type.model_fields.values():
+        annotation = field.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            if not covers_schema(annotation):
+                return False
+    return True
+
+
+def validate(name, instance):
+    """Проверка instance схемой name.
+
+    instance - данные или ApiResult, для ApiResult проверяется исходный
+    payload. Проверка пропускается, только если ответ уже провалидирован
+    моделью из SCHEMA_MODELS, которая покрывает схему (covers_schema).
+    """
+    name = name.removesuffix(".json")
+    model = getattr(instance, "model", None)
+    model_type = SCHEMA_MODELS.get(name)
+    if (
+        model is not None
+        and model_type is not None
+        and isinstance(model, model_type)
+        and covers_schema(model_type)
+    ):
+        return
+    if hasattr(instance, "payload"):
+        instance = instance.payload
+    get_validator(name).validate(instance)
@@ -0,0 +1,83 @@
+"""Настройки проекта из окружения и файла .env.
+
+Окружение читается один раз за процесс при первом вызове get_settings,
+импорт модулей ничего не читает и не загружает .env.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Учетные данные локальной замены сервиса (utils/booker_server.py)
+DEFAULT_USER_NAME = "admin"
+DEFAULT_PASSWORD = "password123"
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+CASSETTE_MODES = ("passthrough", "record", "replay")
+DEFAULT_CASSETTE_MODE = "passthrough"
+DEFAULT_CASSETTE_PATH = "cassettes/api.jsonl.gz"
+# Режимы логирования ответов и вложений Allure (utils/logger.py)
+DEFAULT_LOG_VERBOSITY = "compact"
+DEFAULT_LOG_MAX_BODY_SIZE = 2048
+DEFAULT_ALLURE_ATTACH = "sampled"
+DEFAULT_ALLURE_ATTACH_SAMPLE_RATE = 1.0
+
+
+@dataclass(frozen=True)
+class Settings:
+    """base_url None - сервис не задан, работа идет с локальной заменой"""
+
+    base_url: str = None
+    user_name: str = DEFAULT_USER_NAME
+    password: str = DEFAULT_PASSWORD
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: float = DEFAULT_READ_TIMEOUT
+    cassette_mode: str = DEFAULT_CASSETTE_MODE
+    cassette_path: str = DEFAULT_CASSETTE_PATH
+    booking_mirror: str = None
+    log_verbosity: str = DEFAULT_LOG_VERBOSITY
+    log_max_body_size: int = DEFAULT_LOG_MAX_BODY_SIZE
+    allure_attach: str = DEFAULT_ALLURE_ATTACH
+    allure_attach_sample_rate: float = DEFAULT_ALLURE_ATTACH_SAMPLE_RATE
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        return cls(
+            base_url=environ.get("BASE_URL") or None,
+            user_name=environ.get("USER_NAME", DEFAULT_USER_NAME),
+            password=environ.get("PASSWORD", DEFAULT_PASSWORD),
+            connect_timeout=float(
+                environ.get("BOOKER_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)
+            ),
+            read_timeout=float(
+                environ.get("BOOKER_READ_TIMEOUT", DEFAULT_READ_TIMEOUT)
+            ),
+            cassette_mode=environ.get(
+                "BOOKER_CASSETTE_MODE", DEFAULT_CASSETTE_MODE
+            ),
+            cassette_path=environ.get(
+                "BOOKER_CASSETTE", DEFAULT_CASSETTE_PATH
+            ),
+            booking_mirror=environ.get("BOOKING_MIRROR") or None,
+            log_verbosity=environ.get("LOG_VERBOSITY", DEFAULT_LOG_VERBOSITY),
+            log_max_body_size=int(
+                environ.get("LOG_MAX_BODY_SIZE", DEFAULT_LOG_MAX_BODY_SIZE)
+            ),
+            allure_attach=environ.get("ALLURE_ATTACH", DEFAULT_ALLURE_ATTACH),
+            allure_attach_sample_rate=float(
+                environ.get(
+                    "ALLURE_ATTACH_SAMPLE_RATE",
+                    DEFAULT_ALLURE_ATTACH_SAMPLE_RATE,
+                )
+            ),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    """Общие на процесс настройки: .env (без перезаписи уже заданных
+    переменных) и окружение. get_settings.cache_clear() перечитывает их"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Settings.from_env()
@@ -1,56 +1,59 @@
-import json
 import logging
-import os
-import sys
 from urllib.parse import urljoin
 
 import allure
 import pytest
-import requests
-from dotenv import load_dotenv
-from jsonschema import validate
 
-sys.path.insert(
-    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-)
-
-from functions.api_helper import (  # noqa: E402
+from restful_booker.functions.api_helper import (
     change_all_fields_in_booking,
     change_one_fields_in_booking,
     create_booking,
-    create_token_to_auth,
     create_url_to_get_booking_by_id,
     delete_booking,
+    get_all_bookings,
     get_booking_by_id,
     get_id_new_booking,
+    iter_booking_ids,
 )
-from models.booking import Booking, BookingDates  # noqa: E402
-from utils.logger import response_attaching, response_logging  # noqa: E402
+from restful_booker.functions.booking_cache import BookingCache
+from restful_booker.functions.client import BookerClient
+from restful_booker.models.booking import Booking, BookingDates
+from restful_booker.utils import schema_registry
 
 logger = logging.getLogger(__name__)
 
-load_dotenv()
-URL = os.getenv("URL")
-user_name = os.getenv("USER_NAME")
-password = os.getenv("PASSWORD")
-
 
 @allure.feature("Booking API")
 @allure.story("Получение всех бронирований")
 def test_get_all_booking(get_base_url):
     with allure.step("Отправка GET запроса для получения всех бронирований"):
         url = urljoin(get_base_url, "booking")
-        response = requests.get(url)
-        response_logging(response)
-        response_attaching(response)
+        response = get_all_bookings(url)
 
     with allure.step("Проверка статус кода 200"):
         assert response.status_code == 200
 
     with allure.step("Валидация схемы ответа"):
-        with open("schemas/get_all_booking.json") as file:
-            schema = json.load(file)
-            validate(instance=response.json(), schema=schema)
+        schema_registry.validate("get_all_booking", response)
+
+
+@allure.feature("Booking API")
+@allure.story("Потоковое получение всех бронирований")
+def test_get_all_booking_stream(get_base_url):
+    with allure.step("Получение всех бронирований целиком"):
+        url = urljoin(get_base_url, "booking")
+        expected_ids = [
+            booking["bookingid"] for booking in get_all_bookings(url).json()
+        ]
+
+    with allure.step("Потоковое получение всех бронирований"):
+        streamed_ids = list(iter_booking_ids(url, chunk_size=16))
+
+    with allure.step("Проверка совпадения списков"):
+        assert streamed_ids == expected_ids
+
+    with allure.step("Проверка досрочной остановки"):
+        assert list(iter_booking_ids(url, limit=2)) == expected_ids[:2]
 
 
 @allure.feature("Booking API")
@@ -58,9 +61,7 @@ def test_get_all_booking(get_base_url):
 def test_get_booking_by_id(get_base_url):
     with allure.step("Получение списка всех бронирований"):
         url = urljoin(get_base_url, "booking")
-        response = requests.get(url)
-        response_logging(response)
-        response_attaching(response)
+        response = get_all_bookings(url)
         bookings = response.json()
         assert len(bookings) > 0, "Список бронирований пуст"
 
@@ -82,19 +83,17 @@ def test_get_booking_by_id(get_base_url):
         assert response.status_code == 200
 
     with allure.step("Валидация схемы ответа"):
-        with open("schemas/get_one_booking.json") as file:
-            schema = json.load(file)
-            validate(instance=response.json(), schema=schema)
+        schema_registry.validate("get_one_booking", response)
 
 
 @allure.feature("Booking API")
 @allure.story("Создание нового бронирования")
-def test_create_booking(get_base_url):
+def test_create_booking(get_base_url, worker_namespace, booking_pool):
     with allure.step("Подготовка данных для создания бронирования"):
         url = urljoin(get_base_url, "booking")
         booking = Booking(
-            firstname="Jim",
-            lastname="Brown",
+            firstname=f"{worker_namespace}Jim",
+            lastname=f"{worker_namespace}Brown",
             totalprice=111,
             depositpaid=True,
             bookingdates=BookingDates(
@@ -110,12 +109,11 @@ def test_create_booking(get_base_url):
         assert response.status_code == 200
 
     with allure.step("Валидация схемы ответа"):
-        with open("schemas/post_booking.json") as file:
-            schema = json.load(file)
-            validate(instance=response.json(), schema=schema)
+        schema_registry.validate("post_booking", response)
 
     with allure.step("Проверка созданного бронирования"):
         new_booking_id = get_id_new_booking(response)
+        booking_pool.track(new_booking_id)
         allure.attach(
             str(new_booking_id),
             name="New Booking ID",
@@ -130,128 +128,58 @@ def test_create_booking(get_base_url):
 
 @allure.feature("Booking API")
 @allure.story("Фильтрация бронирований")
-@pytest.mark.parametrize(
-    "firstname, lastname, checkin, checkout",
-    [
-        ("Josh", None, None, None),
-        (None, "Smith", None, None),
-        pytest.param(
-            None,
-            None,
-            "2023-06-10",
-            None,
-            marks=pytest.mark.xfail(
-                reason="Плавающий баг с фильтром по checkin"
-            ),
-        ),
-        pytest.param(
-            None,
-            None,
-            None,
-            "2025-01-10",
-            marks=pytest.mark.xfail(reason="Баг с фильтром по checkout"),
-        ),
-        pytest.param(
-            "Jim",
-            "Brown",
-            None,
-            None,
-            marks=pytest.mark.xfail(
-                reason="Баг с фильтром по нескольким параметрам"
-            ),
-        ),
-    ],
-)
-def test_get_booking_by_filter(
-    get_base_url, firstname, lastname, checkin, checkout
-):
-    with allure.step("Формирование параметров фильтрации"):
-        filter = ""
-        if firstname is not None:
-            filter += f"firstname={firstname}"
-        if lastname is not None:
-            filter += f"lastname={lastname}"
-        if checkin is not None:
-            filter += f"checkin={checkin}"
-        if checkout is not None:
-            filter += f"checkout={checkout}"
+def test_get_booking_by_filter(filter_planner, booking_mirror, booking_filter):
+    """booking_filter - каждый фильтр из BOOKING_FILTERS в conftest.py"""
+    with allure.step("Получение бронирований по фильтру"):
         allure.attach(
-            filter, name="Filter", attachment_type=allure.attachment_type.TEXT
+            booking_filter.query(),
+            name="Filter",
+            attachment_type=allure.attachment_type.TEXT,
         )
-
-    with allure.step("Получение бронирований с фильтром"):
-        url = urljoin(get_base_url, f"booking?{filter}")
-        response = requests.get(url)
-        response_logging(response)
-        response_attaching(response)
-
-    with allure.step("Проверка статус кода 200"):
-        assert response.status_code == 200
-
-    with allure.step("Валидация схемы ответа"):
-        with open("schemas/get_all_booking.json") as file:
-            schema = json.load(file)
-            validate(instance=response.json(), schema=schema)
-
-    with allure.step("Получение деталей первого бронирования"):
-        bookings = response.json()
-        assert len(bookings) > 0, "Список бронирований пуст"
-        first_booking_id = bookings[0]["bookingid"]
-
-        url_booking_id = create_url_to_get_booking_by_id(
-            get_base_url, first_booking_id
+        booking_ids = filter_planner.ids(booking_filter)
+        assert len(booking_ids) > 0, "Список бронирований пуст"
+
+    with allure.step("Проверка соответствия деталей фильтру"):
+        # Ожидаемые ID по локальному зеркалу, без запросов деталей. Тесты
+        # меняют данные параллельно, поэтому recall только в отчет
+        expected = (
+            booking_mirror.query(booking_filter)
+            if booking_mirror is not None
+            else None
+        )
+        report = filter_planner.report(booking_filter, expected=expected)
+        recall = (
+            "" if report.recall is None else f", recall = {report.recall:.3f}"
+        )
+        allure.attach(
+            f"Проверено {report.checked} из {report.returned}, "
+            f"precision = {report.precision:.3f}{recall}, удалено за время "
+            f"проверки {len(report.missing)}",
+            name="Filter report",
+            attachment_type=allure.attachment_type.TEXT,
+        )
+        # 404 - бронирование удалили между списком и деталями, остальные
+        # ошибки получения деталей не должны проходить незамеченными
+        assert not report.errors, (
+            f"Не удалось проверить детали по {booking_filter}: "
+            f"{report.errors}"
+        )
+        assert not report.mismatched, (
+            f"Результат фильтрации по {booking_filter} некорректный: "
+            f"{report.mismatched}"
         )
-
-        response = get_booking_by_id(url_booking_id)
-        booking_detail = response.json()
-
-    with allure.step("Проверка соответствия фильтрам"):
-        if firstname is not None:
-            assert (
-                "firstname" in booking_detail
-            ), "Поле firstname отсутствует в ответе"
-            assert booking_detail["firstname"] == firstname
-
-        if lastname is not None:
-            assert (
-                "lastname" in booking_detail
-            ), "Поле lastname отсутствует в ответе"
-            assert booking_detail["lastname"] == lastname
-
-        if checkin is not None:
-            assert (
-                "bookingdates" in booking_detail
-            ), "Поле bookingdates отсутствует в ответе"
-            assert booking_detail["bookingdates"]["checkin"] >= checkin
-
-        if checkout is not None:
-            assert (
-                "bookingdates" in booking_detail
-            ), "Поле bookingdates отсутствует в ответе"
-            assert booking_detail["bookingdates"]["checkout"] >= checkout, (
-                f"Результат фильтрации по checkout = "
-                f"{checkout} некорректный"
-            )
 
 
 @allure.feature("Booking API")
 @allure.story("Обновление всех полей бронирования")
-def test_update_all_fields_in_booking(get_base_url):
-    with allure.step("Подготовка данных для создания бронирования"):
+def test_update_all_fields_in_booking(
+    get_base_url, token_provider, worker_namespace, booking_pool
+):
+    with allure.step("Подготовка данных для обновления бронирования"):
         url = urljoin(get_base_url, "booking")
-        booking_for_create = Booking(
-            firstname="Jim",
-            lastname="Brown",
-            totalprice=111,
-            depositpaid=True,
-            bookingdates=BookingDates(
-                checkin="2018-01-01", checkout="2019-01-01"
-            ),
-            additionalneeds="Breakfast",
-        )
         booking_with_change = Booking(
-            firstname="Jim-Josef",
-            lastname="Brown-Smith",
+            firstname=f"{worker_namespace}Jim-Josef",
+            lastname=f"{worker_namespace}Brown-Smith",
             totalprice=222,
             depositpaid=False,
             bookingdates=BookingDates(
@@ -260,22 +188,19 @@ def test_update_all_fields_in_booking(get_base_url):
             additionalneeds="Breakfast and wc in room",
         )
 
-    with allure.step("Создание нового бронирования"):
-        new_booking = create_booking(url, booking_for_create)
-        id_booking = get_id_new_booking(new_booking)
+    with allure.step("Получение бронирования из пула"):
+        id_booking, _ = booking_pool.checkout()
         allure.attach(
             str(id_booking),
-            name="Created Booking ID",
+            name="Booking ID",
             attachment_type=allure.attachment_type.TEXT,
         )
         url_booking_id = create_url_to_get_booking_by_id(url, id_booking)
 
-    with allure.step("Получение токена авторизации"):
-        url_auth = urljoin(get_base_url, "auth")
-        token = create_token_to_auth(url_auth, user_name, password)
-
     with allure.step("Обновление всех полей бронирования"):
-        change_all_fields_in_booking(token, url_booking_id, booking_with_change)
+        change_all_fields_in_booking(
+            token_provider, url_booking_id, booking_with_change
+        )
 
     with allure.step("Проверка обновленного бронирования"):
         update_booking = get_booking_by_id(url_booking_id)
@@ -284,37 +209,26 @@ def test_update_all_fields_in_booking(get_base_url):
 
 @allure.feature("Booking API")
 @allure.story("Обновление одного поля бронирования")
-def test_update_one_fields_in_booking(get_base_url):
-    with allure.step("Подготовка данных для создания бронирования"):
+def test_update_one_fields_in_booking(
+    get_base_url, token_provider, booking_pool
+):
+    with allure.step("Подготовка данных для обновления бронирования"):
         url = urljoin(get_base_url, "booking")
-        booking_for_create = Booking(
-            firstname="Jim",
-            lastname="Brown",
-            totalprice=111,
-            depositpaid=True,
-            bookingdates=BookingDates(
-                checkin="2018-01-01", checkout="2019-01-01"
-            ),
-            additionalneeds="Breakfast",
-        )
         field_with_change = {"additionalneeds": "Nothing"}
 
-    with allure.step("Создание нового бронирования"):
-        new_booking = create_booking(url, booking_for_create)
-        id_booking = get_id_new_booking(new_booking)
+    with allure.step("Получение бронирования из пула"):
+        id_booking, _ = booking_pool.checkout()
         allure.attach(
             str(id_booking),
-            name="Created Booking ID",
+            name="Booking ID",
             attachment_type=allure.attachment_type.TEXT,
         )
         url_booking_id = create_url_to_get_booking_by_id(url, id_booking)
 
-    with allure.step("Получение токена авторизации"):
-        url_auth = urljoin(get_base_url, "auth")
-        token = create_token_to_auth(url_auth, user_name, password)
-
     with allure.step("Обновление поля additionalneeds"):
-        change_one_fields_in_booking(token, url_booking_id, field_with_change)
+        change_one_fields_in_booking(
+            token_provider, url_booking_id, field_with_change
+        )
 
     with allure.step("Проверка обновленного поля"):
         update_booking = get_booking_by_id(url_booking_id)
@@ -325,37 +239,60 @@ def test_update_one_fields_in_booking(get_base_url):
 
 
 @allure.feature("Booking API")
-@allure.story("Удаление бронирования")
-def test_delete_booking(get_base_url):
-    with allure.step("Подготовка данных для создания бронирования"):
+@allure.story("Кэш бронирований")
+def test_booking_cache_revalidation(
+    get_base_url, token_provider, booking_pool, request_metrics
+):
+    with allure.step("Клиент с кэшем, который перепроверяет каждое чтение"):
         url = urljoin(get_base_url, "booking")
-        booking_for_create = Booking(
-            firstname="Jim",
-            lastname="Brown",
-            totalprice=111,
-            depositpaid=True,
-            bookingdates=BookingDates(
-                checkin="2018-01-01", checkout="2019-01-01"
-            ),
-            additionalneeds="Breakfast",
-        )
+        cache = BookingCache(ttl=0)
+        client = BookerClient(observers=[request_metrics], booking_cache=cache)
+        id_booking, _ = booking_pool.checkout()
+        url_booking_id = create_url_to_get_booking_by_id(url, id_booking)
 
-    with allure.step("Создание нового бронирования"):
-        new_booking = create_booking(url, booking_for_create)
-        id_booking = get_id_new_booking(new_booking)
+    with client:
+        with allure.step("Первое чтение - промах"):
+            first = get_booking_by_id(url_booking_id, client=client)
+            assert first.status_code == 200
+            assert cache.stats()["misses"] == 1
+
+        with allure.step("Повторное чтение - условный запрос и 304"):
+            if not first.headers.get("ETag"):
+                pytest.skip("Сервис не отдает ETag")
+            second = get_booking_by_id(url_booking_id, client=client)
+            assert second.json() == first.json()
+            assert cache.stats()["revalidated"] == 1
+
+        with allure.step("Изменение сбрасывает запись"):
+            field_with_change = {"additionalneeds": "Dinner"}
+            change_one_fields_in_booking(
+                token_provider,
+                url_booking_id,
+                field_with_change,
+                client=client,
+            )
+            assert len(cache) == 0
+            changed = get_booking_by_id(url_booking_id, client=client)
+            assert changed.json()["additionalneeds"] == "Dinner"
+            assert cache.stats()["misses"] == 2
+
+
+@allure.feature("Booking API")
+@allure.story("Удаление бронирования")
+def test_delete_booking(get_base_url, token_provider, booking_pool):
+    with allure.step("Получение бронирования из пула"):
+        url = urljoin(get_base_url, "booking")
+        id_booking, _ = booking_pool.checkout()
         allure.attach(
             str(id_booking),
-            name="Created Booking ID",
+            name="Booking ID",
             attachment_type=allure.attachment_type.TEXT,
         )
         url_booking_id = create_url_to_get_booking_by_id(url, id_booking)
 
-    with allure.step("Получение токена авторизации"):
-        url_auth = urljoin(get_base_url, "auth")
-        token = create_token_to_auth(url_auth, user_name, password)
-
     with allure.step("Удаление бронирования"):
-        delete_booking(token, url_booking_id)
+        delete_booking(token_provider, url_booking_id)
+        booking_pool.forget(id_booking)
 
     with allure.step("Проверка что бронирование удалено (статус 404)"):
         booking = get_booking_by_id(url_booking_id)
@@ -0,0 +1,33 @@
+import json
+from datetime import timedelta
+
+import pytest
+import requests
+
+from restful_booker.utils.booker_server import BookerServer
+
+
+@pytest.fixture
+def booker_server():
+    """Своя локальная замена сервиса на каждый тест: очередь сбоев и
+    данные одного теста не влияют на другие"""
+    with BookerServer() as server:
+        yield server
+
+
+@pytest.fixture
+def make_response():
+    return _make_response
+
+
+def _make_response(payload, status_code=200):
+    """requests.Response с JSON телом без обращения к сети"""
+    request = requests.Request("GET", "http://localhost/booking/1").prepare()
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = request.url
+    response.request = request
+    response.headers["Content-Type"] = "application/json"
+    response.elapsed = timedelta(milliseconds=5)
+    response._content = json.dumps(payload).encode()
+    return response
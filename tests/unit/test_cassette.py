@@ -0,0 +1,44 @@
+import base64
+
+from restful_booker.functions.cassette import (
+    MODE_RECORD,
+    MODE_REPLAY,
+    Cassette,
+)
+from restful_booker.functions.client import BookerClient
+
+
+def make_client(url, cassette):
+    return BookerClient(
+        base_url=url,
+        retry_policy=None,
+        circuit_breaker=None,
+        cassette=cassette,
+    )
+
+
+def test_streamed_response_is_recorded(booker_server, tmp_path):
+    path = tmp_path / "stream.jsonl.gz"
+    with Cassette(path, mode=MODE_RECORD) as cassette:
+        with make_client(booker_server.url, cassette) as client:
+            with client.get("booking", stream=True) as response:
+                assert cassette.recorded == []
+                body = b"".join(response.iter_content(64))
+        assert len(cassette.recorded) == 1
+
+    with make_client(
+        "http://replay.invalid/", Cassette(path, MODE_REPLAY)
+    ) as client:
+        assert client.get("booking").content == body
+
+
+def test_closed_stream_is_recorded_whole(booker_server, tmp_path):
+    path = tmp_path / "stream.jsonl.gz"
+    with Cassette(path, mode=MODE_RECORD) as cassette:
+        with make_client(booker_server.url, cassette) as client:
+            full = client.get("booking").content
+            with client.get("booking", stream=True) as response:
+                next(response.iter_content(16))
+
+    streamed = cassette.recorded[-1]["body"]
+    assert base64.b64decode(streamed) == full
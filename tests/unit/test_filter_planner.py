@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+import requests
+
+from restful_booker.functions.client import BookerClient
+from restful_booker.functions.filter_planner import (
+    BookingFilter,
+    FilterPlanner,
+)
+from restful_booker.functions.filter_verifier import (
+    check_filter,
+    fetch_bookings,
+)
+
+FILTERS = [
+    BookingFilter(firstname="Jim"),
+    BookingFilter(lastname="Brown"),
+    BookingFilter(firstname="Jim"),
+    BookingFilter(checkin="2018-01-01"),
+    BookingFilter(lastname="Brown"),
+]
+
+
+@pytest.fixture
+def planner(booker_server):
+    with BookerClient(
+        base_url=booker_server.url, retry_policy=None, circuit_breaker=None
+    ) as client:
+        yield FilterPlanner(booker_server.url, client=client)
+
+
+def test_each_distinct_filter_sent_once(planner):
+    planner.plan(FILTERS)
+    planner.plan(FILTERS)
+    for booking_filter in FILTERS:
+        planner.report(booking_filter)
+    assert planner.queries_sent == len(set(FILTERS))
+
+
+def test_concurrent_plans_share_queries(planner):
+    threads = [
+        threading.Thread(target=planner.plan, args=(FILTERS,))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert planner.queries_sent == len(set(FILTERS))
+    assert planner.report(BookingFilter(firstname="Jim")).mismatched == {}
+
+
+def test_error_is_recorded_per_filter(planner, monkeypatch):
+    broken = BookingFilter(lastname="Brown")
+    query = planner._query
+
+    def failing_query(booking_filter):
+        if booking_filter == broken:
+            raise requests.ConnectionError("reset")
+        return query(booking_filter)
+
+    monkeypatch.setattr(planner, "_query", failing_query)
+    planner.plan(FILTERS)
+
+    with pytest.raises(requests.ConnectionError):
+        planner.report(broken)
+    assert planner.ids(BookingFilter(firstname="Jim"))
+    assert planner.report(BookingFilter(firstname="Jim")).mismatched == {}
+    assert planner.queries_sent == len(set(FILTERS))
+
+
+def test_detail_errors_are_reported(booker_server, planner):
+    # Бронирование с датами в обратном порядке не проходит модель Booking
+    invalid_id = booker_server.store.add(
+        {
+            "firstname": "Jim",
+            "lastname": "Lee",
+            "totalprice": 100,
+            "depositpaid": True,
+            "bookingdates": {
+                "checkin": "2024-02-10",
+                "checkout": "2024-02-01",
+            },
+            "additionalneeds": "",
+        }
+    )
+    errors = {}
+    booker_server.fail_next(1, status=500)
+
+    bookings = fetch_bookings(
+        booker_server.url,
+        [1, invalid_id, 999],
+        workers=1,
+        client=planner.client,
+        errors=errors,
+    )
+    report = check_filter({}, [1, invalid_id, 999], bookings, errors=errors)
+
+    assert report.errors == {
+        1: "HTTP 500",
+        invalid_id: errors[invalid_id],
+    }
+    assert errors[invalid_id].startswith("ValidationError")
+    assert report.missing == [999]
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from restful_booker.functions.async_api_helper import (
+    AsyncBookerClient,
+    gather_limited,
+)
+from restful_booker.functions.auth import get_token_provider
+from restful_booker.functions.booking_pool import BookingPool
+from restful_booker.utils.settings import DEFAULT_PASSWORD, DEFAULT_USER_NAME
+
+
+async def value(result, delay=0.0):
+    await asyncio.sleep(delay)
+    return result
+
+
+async def fail(delay=0.0):
+    await asyncio.sleep(delay)
+    raise KeyError("boom")
+
+
+def test_results_in_input_order():
+    coroutines = (value(index, delay=(5 - index) / 1000) for index in range(5))
+    assert asyncio.run(gather_limited(coroutines, 3)) == list(range(5))
+
+
+@pytest.mark.parametrize("concurrency", [0, -1])
+def test_rejects_non_positive_concurrency(concurrency):
+    coroutines = iter(())
+    with pytest.raises(ValueError):
+        asyncio.run(gather_limited(coroutines, concurrency))
+
+
+def test_error_unwrapped_and_partial_results_kept():
+    results = {}
+    coroutines = [value(0), value(1), fail(delay=0.01), value(3, delay=1)]
+    with pytest.raises(KeyError):
+        asyncio.run(gather_limited(iter(coroutines), 2, results=results))
+    assert results == {0: 0, 1: 1}
+    for coroutine in coroutines:
+        coroutine.close()
+
+
+def test_pool_keeps_ids_created_before_error(booker_server, monkeypatch):
+    create_booking = AsyncBookerClient.create_booking
+    calls = []
+
+    async def flaky_create(self, url, booking):
+        calls.append(booking)
+        if len(calls) == 3:
+            raise ConnectionError("reset")
+        return await create_booking(self, url, booking)
+
+    monkeypatch.setattr(AsyncBookerClient, "create_booking", flaky_create)
+    token = get_token_provider(
+        booker_server.url + "auth", DEFAULT_USER_NAME, DEFAULT_PASSWORD
+    )
+    pool = BookingPool(booker_server.url, token, size=5, concurrency=1)
+    before = len(booker_server.store)
+    with pytest.raises(ConnectionError):
+        pool.fill()
+    assert len(pool.created_ids) == 2
+    assert len(booker_server.store) == before + 2
+
+    pool.cleanup()
+    assert len(booker_server.store) == before
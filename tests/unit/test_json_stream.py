@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from restful_booker.utils.json_stream import iter_json_array
+
+
+def chunked(text, size=1):
+    data = text.encode()
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[]",
+        " [ ] ",
+        "[1.5]",
+        "[1, -2.5e3, 10]",
+        '[true, false, null, "a,]b"]',
+        '[{"bookingid": 1}, {"bookingid": 22}]',
+        '[[1, 2], [], {"a": [3]}]',
+        '["Ёлка", "日本"]',
+    ],
+)
+@pytest.mark.parametrize("size", [1, 2, 1024])
+def test_matches_json_loads(text, size):
+    assert list(iter_json_array(chunked(text, size))) == json.loads(text)
+
+
+def test_number_split_across_chunks_is_not_cut():
+    assert list(iter_json_array([b"[1", b"2", b".", b"5]"])) == [12.5]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[1 2]",
+        "[1,,2]",
+        "[,1]",
+        "[1,]",
+        "[1]garbage",
+        "[1] ]",
+        "[1",
+        "[tru]",
+        "[1x]",
+        '[{"a": 1}{"b": 2}]',
+        "{}",
+    ],
+)
+def test_rejects_invalid_arrays(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(text)))
+
+
+def test_items_arrive_before_the_array_ends():
+    items = iter_json_array(chunked('[{"bookingid": 1}, {"bookingid": 2}'))
+    assert next(items) == {"bookingid": 1}
+    assert next(items) == {"bookingid": 2}
+    with pytest.raises(ValueError):
+        next(items)
@@ -0,0 +1,65 @@
+import pytest
+
+from restful_booker.functions.client import BookerClient
+from restful_booker.tools.mirror import BookingMirror
+
+INVALID_BOOKING = {
+    "firstname": "Ann",
+    "lastname": "Lee",
+    "totalprice": 100,
+    "depositpaid": True,
+    "bookingdates": {"checkin": "2024-02-10", "checkout": "2024-02-01"},
+    "additionalneeds": "",
+}
+
+
+@pytest.fixture
+def client(booker_server):
+    with BookerClient(
+        base_url=booker_server.url, retry_policy=None, circuit_breaker=None
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    with BookingMirror(str(tmp_path / "mirror.sqlite3")) as mirror:
+        yield mirror
+
+
+def test_invalid_booking_does_not_abort_sync(booker_server, client, mirror):
+    # Даты в обратном порядке не проходят модель Booking
+    invalid_id = booker_server.store.add(INVALID_BOOKING)
+    valid_ids = set(booker_server.store.filter()) - {invalid_id}
+
+    report = mirror.sync(booker_server.url, client=client)
+
+    assert report.failed == [invalid_id]
+    assert set(report.added) == valid_ids
+    assert mirror.ids() == valid_ids
+    assert report.total == len(valid_ids)
+
+
+def test_incremental_resync(booker_server, client, mirror):
+    first = mirror.sync(booker_server.url, client=client)
+    removed_id = first.added[0]
+    booker_server.store.delete(removed_id)
+    booking = mirror.get(first.added[1]).model_dump()
+    added_id = booker_server.store.add(booking)
+
+    report = mirror.sync(booker_server.url, client=client)
+
+    assert report.added == [added_id]
+    assert report.removed == [removed_id]
+    assert report.failed == []
+    assert mirror.ids() == set(booker_server.store.filter())
+    assert mirror.added_since(first.run_id) == {added_id}
+
+
+def test_refresh_is_not_added(booker_server, client, mirror):
+    first = mirror.sync(booker_server.url, client=client)
+
+    report = mirror.sync(booker_server.url, client=client, refresh=True)
+
+    assert report.added == []
+    assert mirror.added_since(first.run_id) == set()
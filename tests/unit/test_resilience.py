@@ -0,0 +1,191 @@
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from restful_booker.functions import resilience
+from restful_booker.functions.cassette import CassetteMissError
+from restful_booker.functions.client import BookerClient
+from restful_booker.functions.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    retry_after_seconds,
+    send_with_resilience,
+)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Задержки между повторами без реального ожидания"""
+    recorded = []
+    monkeypatch.setattr(resilience.time, "sleep", recorded.append)
+    return recorded
+
+
+def make_client(server, **kwargs):
+    kwargs.setdefault("retry_policy", RetryPolicy(max_retries=2))
+    kwargs.setdefault("circuit_breaker", None)
+    return BookerClient(base_url=server.url, **kwargs)
+
+
+def test_get_retried_on_503(booker_server, sleeps):
+    booker_server.fail_next(2)
+    with make_client(booker_server) as client:
+        response = client.get("booking/1")
+    assert response.status_code == 200
+    assert response.retries == 2
+    assert len(sleeps) == 2
+
+
+def test_retries_exhausted(booker_server, sleeps):
+    booker_server.fail_next(3)
+    with make_client(booker_server) as client:
+        response = client.get("booking/1")
+    assert response.status_code == 503
+    assert response.retries == 2
+
+
+def test_500_not_retried(booker_server, sleeps):
+    booker_server.fail_next(1, status=500)
+    with make_client(booker_server) as client:
+        response = client.get("booking/1")
+    assert response.status_code == 500
+    assert response.retries == 0
+    assert sleeps == []
+
+
+def test_post_not_retried_without_opt_in(booker_server, sleeps):
+    booker_server.fail_next(1)
+    with make_client(booker_server) as client:
+        response = client.post("booking", json={})
+    assert response.status_code == 503
+    assert response.retries == 0
+    assert sleeps == []
+
+
+def test_post_retried_with_opt_in(booker_server, sleeps):
+    booker_server.fail_next(1, status=502)
+    policy = RetryPolicy(max_retries=1, retry_post=True)
+    with make_client(booker_server, retry_policy=policy) as client:
+        response = client.post("auth", json={})
+    assert response.status_code == 200
+    assert response.retries == 1
+
+
+def test_get_not_retried_when_not_idempotent(booker_server, sleeps):
+    booker_server.fail_next(1)
+    with make_client(booker_server) as client:
+        response = client.get("booking/1", idempotent=False)
+    assert response.status_code == 503
+    assert response.retries == 0
+
+
+def test_connection_errors_retried(sleeps):
+    calls = []
+
+    def send():
+        calls.append(1)
+        raise requests.ConnectionError("reset")
+
+    with pytest.raises(requests.ConnectionError):
+        send_with_resilience(send, "GET", RetryPolicy(max_retries=3))
+    assert len(calls) == 4
+
+
+def test_backoff_is_jittered_exponential():
+    policy = RetryPolicy(backoff_base=0.2, backoff_max=1.0)
+    random.seed(0)
+    for attempt in range(6):
+        cap = min(1.0, 0.2 * 2**attempt)
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert all(0 <= delay <= cap for delay in delays)
+        assert max(delays) > cap * 0.8
+
+
+def test_retry_after_is_capped(booker_server, sleeps):
+    booker_server.fail_next(1, retry_after="120")
+    policy = RetryPolicy(max_retries=1, backoff_max=0.5)
+    with make_client(booker_server, retry_policy=policy) as client:
+        response = client.get("booking/1")
+    assert response.status_code == 200
+    assert sleeps == [0.5]
+
+
+def test_retry_after_used_below_cap(booker_server, sleeps):
+    booker_server.fail_next(1, retry_after="0")
+    with make_client(booker_server) as client:
+        assert client.get("booking/1").status_code == 200
+    assert sleeps == [0.0]
+
+
+def test_retry_after_parsing():
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert retry_after_seconds("7") == 7.0
+    assert 25 < retry_after_seconds(format_datetime(later, usegmt=True)) <= 30
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds("soon") is None
+
+
+def test_breaker_opens_after_threshold(booker_server, sleeps):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    booker_server.fail_next(2)
+    with make_client(
+        booker_server, retry_policy=None, circuit_breaker=breaker
+    ) as client:
+        assert client.get("booking/1").status_code == 503
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert client.get("booking/1").status_code == 503
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            client.get("booking/1")
+
+
+def test_breaker_half_open_probe(booker_server):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    booker_server.fail_next(2)
+    with make_client(
+        booker_server, retry_policy=None, circuit_breaker=breaker
+    ) as client:
+        client.get("booking/1")
+        assert breaker.state == CircuitBreaker.OPEN
+        # Пробный запрос неудачен - размыкатель снова открыт
+        assert client.get("booking/1").status_code == 503
+        assert breaker.state == CircuitBreaker.OPEN
+        assert client.get("booking/1").status_code == 200
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_only_one_probe_in_flight():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.exceptions.ChunkedEncodingError("cut"),
+        requests.exceptions.ContentDecodingError("gzip"),
+        CassetteMissError("miss"),
+    ],
+)
+def test_probe_released_on_other_errors(error):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    def send():
+        raise error
+
+    with pytest.raises(type(error)):
+        send_with_resilience(send, "GET", circuit_breaker=breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    response = requests.Response()
+    response.status_code = 200
+    send_with_resilience(lambda: response, "GET", circuit_breaker=breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,54 @@
+import pytest
+from jsonschema import ValidationError
+
+from restful_booker.functions.result import ApiResult
+from restful_booker.models.booking import Booking, BookingResponse
+from restful_booker.utils import schema_registry
+
+BOOKING = {
+    "firstname": "Jim",
+    "lastname": "Brown",
+    "totalprice": 111,
+    "depositpaid": True,
+    "bookingdates": {"checkin": "2018-01-01", "checkout": "2019-01-01"},
+    "additionalneeds": "Breakfast",
+}
+
+# Каждое изменение модель в обычном режиме пропускает, а схема - нет
+LAX_CHANGES = [
+    pytest.param({"totalprice": "111"}, id="price-as-string"),
+    pytest.param({"depositpaid": "true"}, id="deposit-as-string"),
+    pytest.param(
+        {"bookingdates": {**BOOKING["bookingdates"], "extra": 1}},
+        id="extra-key-in-dates",
+    ),
+]
+
+
+@pytest.mark.parametrize("change", LAX_CHANGES)
+def test_schema_checked_after_lax_model(make_response, change):
+    result = ApiResult(make_response({**BOOKING, **change}))
+    result.validate(Booking)
+    with pytest.raises(ValidationError):
+        schema_registry.validate("get_one_booking", result)
+
+
+@pytest.mark.parametrize("change", LAX_CHANGES)
+def test_post_schema_checked_after_lax_model(make_response, change):
+    payload = {"bookingid": 1, "booking": {**BOOKING, **change}}
+    result = ApiResult(make_response(payload))
+    result.validate(BookingResponse)
+    with pytest.raises(ValidationError):
+        schema_registry.validate("post_booking", result)
+
+
+def test_valid_payload_passes(make_response):
+    result = ApiResult(make_response(BOOKING))
+    result.validate(Booking)
+    schema_registry.validate("get_one_booking", result)
+    assert result.json() == BOOKING
+
+
+def test_lax_models_do_not_cover_schemas():
+    assert not schema_registry.covers_schema(Booking)
+    assert not schema_registry.covers_schema(BookingResponse)